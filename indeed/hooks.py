@@ -193,8 +193,35 @@ required_apps = ["erpnext", "hrms"]
 # ---------------
 doc_events = {
 	"Job Opening": {
-		"on_update": "indeed.indeed.utils.on_job_opening_save",
-		"after_insert": "indeed.indeed.utils.on_job_opening_save"
+		"on_update": [
+			"indeed.indeed.utils.on_job_opening_save",
+			"indeed.indeed.cache.invalidate_job_selection"
+		],
+		"after_insert": [
+			"indeed.indeed.utils.on_job_opening_save",
+			"indeed.indeed.cache.invalidate_job_selection"
+		],
+		"after_delete": "indeed.indeed.cache.invalidate_job_selection"
+	},
+	"Job Applicant": {
+		"after_insert": [
+			"indeed.indeed.analytics_rollup.increment_rollup",
+			"indeed.indeed.cache.invalidate_application_analytics",
+			"indeed.indeed.ab_statistics.record_application"
+		],
+		"on_update": [
+			"indeed.indeed.analytics_rollup.refresh_rollup_for_applicant",
+			"indeed.indeed.cache.invalidate_application_analytics"
+		],
+		"after_delete": [
+			"indeed.indeed.analytics_rollup.refresh_rollup_for_applicant",
+			"indeed.indeed.cache.invalidate_application_analytics"
+		]
+	},
+	"Indeed Job Integration": {
+		"after_insert": "indeed.indeed.cache.invalidate_integration_dashboard",
+		"on_update": "indeed.indeed.cache.invalidate_integration_dashboard",
+		"after_delete": "indeed.indeed.cache.invalidate_integration_dashboard"
 	}
 }
 
@@ -269,6 +296,8 @@ fixtures = [
                     "Job Applicant-custom_indeed_application_id",
                     "Job Opening-custom_post_to_indeed",
                     "Job Opening-custom_indeed_job_id",
+                    "Job Opening-custom_ab_test_campaign",
+                    "Job Opening-custom_ab_test_variant",
                 ]
             ]
         ]
@@ -284,11 +313,21 @@ fixtures = [
 # Scheduled Events
 # ----------------
 scheduler_events = {
+	"cron": {
+		"*/5 * * * *": [
+			"indeed.indeed.ab_tracking.flush_counters"
+		],
+		"*/15 * * * *": [
+			"indeed.indeed.sync.sync_indeed_jobs"
+		]
+	},
 	"daily": [
 		"indeed.indeed.monitoring.monitor_indeed_integration"
 	],
 	"hourly": [
-		"indeed.indeed.utils.regenerate_xml_feed"
+		"indeed.indeed.utils.regenerate_xml_feed",
+		"indeed.indeed.analytics_rollup.sync_application_rollup",
+		"indeed.indeed.ab_statistics.evaluate_active_campaigns"
 	]
 }
 
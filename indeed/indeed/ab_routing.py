@@ -0,0 +1,150 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, get_url
+from indeed.indeed.ab_tracking import record_event
+from urllib.parse import quote
+import hashlib
+import random
+
+
+# Redis hash of {campaign: routing data}, see `load_campaign_routing`
+CAMPAIGN_ROUTING_KEY = "indeed:ab_campaign_routing"
+
+VISITOR_COOKIE = "indeed_ab_visitor"
+VISITOR_COOKIE_MAX_AGE = 180 * 24 * 60 * 60
+
+# Resolution of the traffic split; 10000 buckets allow splits in steps of 0.01%
+SPLIT_BUCKETS = 10000
+
+
+def get_campaign_routing(campaign):
+	"""Return the cached routing data of `campaign`, loading it on a miss"""
+	
+	return frappe.cache().hget(CAMPAIGN_ROUTING_KEY, campaign, generator=lambda: load_campaign_routing(campaign))
+
+
+def load_campaign_routing(campaign):
+	"""Read what the router needs to know about `campaign` from the database"""
+	
+	data = frappe.db.get_value(
+		"AB Test Campaign", campaign,
+		["status", "allocation_mode", "traffic_split", "base_job_opening", "variant_a_job", "variant_b_job",
+		 "start_date", "end_date"],
+		as_dict=True
+	)
+	if not data:
+		return {}
+	
+	routing = {
+		"active": data.status == "Active",
+		"mode": data.allocation_mode or "Fixed Split",
+		"traffic_split": cint(data.traffic_split),
+		"start_date": data.start_date,
+		"end_date": data.end_date,
+		"base_job": data.base_job_opening,
+		"jobs": {"Variant A": data.variant_a_job, "Variant B": data.variant_b_job}
+	}
+	
+	if routing["mode"] == "Bandit":
+		# [variant, job opening, applications, views] per arm
+		routing["arms"] = [
+			[row.variant, row.job_opening, cint(row.applications), cint(row.views)]
+			for row in frappe.get_all(
+				"AB Test Campaign Variant",
+				filters={"parent": campaign, "parenttype": "AB Test Campaign"},
+				fields=["variant", "job_opening", "applications", "views"],
+				order_by="idx"
+			)
+			if row.job_opening
+		]
+		routing["jobs"] = {variant: job for variant, job, _applications, _views in routing["arms"]}
+	
+	return routing
+
+
+def clear_campaign_routing_cache(campaign):
+	frappe.cache().hdel(CAMPAIGN_ROUTING_KEY, campaign)
+
+
+def get_campaign_url(campaign):
+	"""Public URL that splits visitors of `campaign` between its variants"""
+	
+	return f"{get_url()}/api/method/indeed.indeed.ab_routing.visit?campaign={quote(campaign)}"
+
+
+def assign_variant(campaign, visitor_key, traffic_split):
+	"""Deterministically assign a visitor to "Variant A" or "Variant B"
+	
+	The visitor key is hashed into one of SPLIT_BUCKETS buckets per campaign;
+	the first `traffic_split` percent of buckets get Variant A. The same
+	visitor always lands in the same variant of a campaign.
+	"""
+	
+	digest = hashlib.md5(f"{campaign}:{visitor_key}".encode()).digest()
+	bucket = int.from_bytes(digest[:8], "big") % SPLIT_BUCKETS
+	
+	return "Variant A" if bucket < traffic_split * SPLIT_BUCKETS // 100 else "Variant B"
+
+
+def sample_variant(campaign, visitor_key, arms):
+	"""Pick a bandit arm by Thompson sampling
+	
+	Each arm's conversion rate gets a Beta(1 + applications, 1 + views -
+	applications) posterior and the arm with the highest draw wins, so
+	traffic moves toward better-converting variants as counts grow. Draws
+	are seeded by campaign and visitor, so a visitor keeps their variant
+	until the counts change.
+	"""
+	
+	rng = random.Random(f"{campaign}:{visitor_key}")
+	
+	def draw(arm):
+		_variant, _job, applications, views = arm
+		return rng.betavariate(1 + applications, 1 + max(views - applications, 0))
+	
+	return max(arms, key=draw)[0]
+
+
+def get_visitor_key():
+	"""Return the visitor's AB test key, setting a long-lived cookie on first visit"""
+	
+	visitor_key = frappe.request.cookies.get(VISITOR_COOKIE) if frappe.request else None
+	
+	if not visitor_key:
+		visitor_key = frappe.generate_hash(length=20)
+		frappe.local.cookie_manager.set_cookie(VISITOR_COOKIE, visitor_key, max_age=VISITOR_COOKIE_MAX_AGE)
+	
+	return visitor_key
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def visit(campaign, visitor=None):
+	"""Redirect a visitor to the variant job assigned to them and count the view
+	
+	`visitor` may be passed by callers that have their own stable visitor or
+	session id; otherwise a cookie is used. Campaigns that are not running
+	send visitors to the base job opening.
+	"""
+	
+	routing = get_campaign_routing(campaign)
+	if not routing:
+		frappe.throw(_("AB Test Campaign {0} not found").format(campaign), frappe.DoesNotExistError)
+	
+	job = routing["base_job"]
+	
+	if routing["active"]:
+		visitor_key = visitor or get_visitor_key()
+		
+		if routing["mode"] == "Bandit":
+			variant = sample_variant(campaign, visitor_key, routing["arms"]) if routing["arms"] else None
+		else:
+			variant = assign_variant(campaign, visitor_key, routing["traffic_split"])
+		
+		job = routing["jobs"].get(variant) or job
+		record_event(job, "view")
+	
+	if not job:
+		frappe.throw(_("AB Test Campaign {0} has no job opening to show").format(campaign), frappe.DoesNotExistError)
+	
+	frappe.local.response["type"] = "redirect"
+	frappe.local.response["location"] = f"/jobs/{quote(job)}"
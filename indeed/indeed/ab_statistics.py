@@ -0,0 +1,293 @@
+import frappe
+from frappe.utils import cint, getdate
+from indeed.indeed.ab_routing import clear_campaign_routing_cache, get_campaign_routing
+from indeed.indeed.ab_tracking import get_variant_jobs
+from collections import defaultdict
+import math
+
+
+# Campaign field prefix of each variant label stored on variant jobs
+VARIANT_FIELDS = {"Variant A": "variant_a", "Variant B": "variant_b"}
+
+# Two-sided significance level of the final two-proportion test
+SIGNIFICANCE_LEVEL = 0.05
+
+# Posterior probability at which a live test may be stopped early
+EARLY_STOP_PROBABILITY = 0.99
+
+# Views each variant needs before early stopping is suggested
+MIN_VIEWS_FOR_EARLY_STOP = 100
+
+
+def two_proportion_test(conversions_a, trials_a, conversions_b, trials_b):
+	"""Two-sided pooled two-proportion z-test; returns (z, p_value)"""
+	
+	if trials_a <= 0 or trials_b <= 0:
+		return 0.0, 1.0
+	
+	pooled = (conversions_a + conversions_b) / (trials_a + trials_b)
+	variance = pooled * (1 - pooled) * (1 / trials_a + 1 / trials_b)
+	if variance <= 0:
+		return 0.0, 1.0
+	
+	z = (conversions_b / trials_b - conversions_a / trials_a) / math.sqrt(variance)
+	return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def probability_b_beats_a(conversions_a, trials_a, conversions_b, trials_b):
+	"""P(rate B > rate A) under uniform Beta priors, by normal approximation of the posteriors"""
+	
+	def beta_moments(conversions, trials):
+		alpha = 1 + conversions
+		beta = 1 + max(trials - conversions, 0)
+		mean = alpha / (alpha + beta)
+		variance = alpha * beta / ((alpha + beta) ** 2 * (alpha + beta + 1))
+		return mean, variance
+	
+	mean_a, variance_a = beta_moments(conversions_a, trials_a)
+	mean_b, variance_b = beta_moments(conversions_b, trials_b)
+	
+	return 0.5 * math.erfc(-(mean_b - mean_a) / math.sqrt(2 * (variance_a + variance_b)))
+
+
+def evaluate_counts(applications_a, views_a, applications_b, views_b, final=False):
+	"""Return campaign result fields computed from running counts in O(1)
+	
+	Live evaluations only name a winner once the fixed-level test is
+	significant; early stopping relies on the Bayesian posterior, which
+	stays valid when results are checked repeatedly.
+	"""
+	
+	_z, p_value = two_proportion_test(applications_a, views_a, applications_b, views_b)
+	prob_b = probability_b_beats_a(applications_a, views_a, applications_b, views_b)
+	significant = p_value < SIGNIFICANCE_LEVEL and min(views_a, views_b) > 0
+	
+	if significant:
+		winner = "Variant B" if prob_b > 0.5 else "Variant A"
+	else:
+		winner = "No Significant Difference" if final else ""
+	
+	return {
+		"variant_a_conversion": applications_a / views_a * 100 if views_a else 0,
+		"variant_b_conversion": applications_b / views_b * 100 if views_b else 0,
+		"p_value": p_value,
+		"confidence_level": (1 - p_value) * 100,
+		"statistical_significance": cint(significant),
+		"prob_b_beats_a": prob_b * 100,
+		"early_stop_recommended": cint(
+			min(views_a, views_b) >= MIN_VIEWS_FOR_EARLY_STOP
+			and max(prob_b, 1 - prob_b) >= EARLY_STOP_PROBABILITY
+		),
+		"winner": winner
+	}
+
+
+def refresh_campaign_statistics(campaign):
+	"""Recompute a running campaign's live results from its counters"""
+	
+	counts = frappe.db.get_value(
+		"AB Test Campaign", campaign,
+		["status", "variant_a_applications", "variant_a_views", "variant_b_applications", "variant_b_views"],
+		as_dict=True
+	)
+	if not counts or counts.status != "Active":
+		return
+	
+	results = evaluate_counts(
+		cint(counts.variant_a_applications), cint(counts.variant_a_views),
+		cint(counts.variant_b_applications), cint(counts.variant_b_views)
+	)
+	frappe.db.set_value("AB Test Campaign", campaign, results, update_modified=False)
+
+
+def get_leading_variant(arms):
+	"""Return the bandit arm with the highest posterior mean conversion rate"""
+	
+	if not arms:
+		return ""
+	
+	def posterior_mean(arm):
+		_variant, _job, applications, views = arm
+		return (1 + applications) / (2 + max(views, applications))
+	
+	return max(arms, key=posterior_mean)[0]
+
+
+def refresh_bandit_statistics(campaign):
+	"""Reload a bandit campaign's arms into the router and update its leading variant"""
+	
+	clear_campaign_routing_cache(campaign)
+	
+	routing = get_campaign_routing(campaign)
+	if routing.get("active"):
+		frappe.db.set_value(
+			"AB Test Campaign", campaign, "leading_variant", get_leading_variant(routing["arms"]),
+			update_modified=False
+		)
+
+
+def increment_counters(increments):
+	"""Add to campaign counters and refresh the live results of each touched campaign
+	
+	`increments` maps (campaign, variant label, "applications" | "views") to
+	the amount to add. Bandit campaigns keep their counters on the matching
+	AB Test Campaign Variant row.
+	"""
+	
+	campaigns = set()
+	bandit_campaigns = set()
+	
+	for (campaign, variant, counter), amount in increments.items():
+		if not amount:
+			continue
+		
+		if get_campaign_routing(campaign).get("mode") == "Bandit":
+			frappe.db.sql(f"""
+				UPDATE `tabAB Test Campaign Variant` v
+				INNER JOIN `tabAB Test Campaign` c ON c.name = v.parent
+				SET v.`{counter}` = IFNULL(v.`{counter}`, 0) + %s
+				WHERE v.parent = %s AND v.parenttype = 'AB Test Campaign'
+					AND v.variant = %s AND c.status = 'Active'
+			""", [amount, campaign, variant])
+			bandit_campaigns.add(campaign)
+			continue
+		
+		prefix = VARIANT_FIELDS.get(variant)
+		if not prefix:
+			continue
+		
+		fieldname = f"{prefix}_{counter}"
+		frappe.db.sql(f"""
+			UPDATE `tabAB Test Campaign`
+			SET `{fieldname}` = IFNULL(`{fieldname}`, 0) + %s
+			WHERE name = %s AND status = 'Active'
+		""", [amount, campaign])
+		campaigns.add(campaign)
+	
+	for campaign in campaigns:
+		refresh_campaign_statistics(campaign)
+	
+	for campaign in bandit_campaigns:
+		refresh_bandit_statistics(campaign)
+
+
+def in_campaign_window(day, routing):
+	"""Whether `day` falls within the campaign's start and end dates, as in `get_campaign_counts`"""
+	
+	if not day or not routing.get("start_date"):
+		return False
+	
+	day = getdate(day)
+	return getdate(routing["start_date"]) <= day and (
+		not routing.get("end_date") or day <= getdate(routing["end_date"])
+	)
+
+
+def record_application(doc, method=None):
+	"""Job Applicant after_insert hook: count applications to running variant jobs"""
+	
+	variant = get_variant_jobs().get(doc.job_title)
+	if not variant:
+		return
+	
+	campaign, variant_label = variant
+	
+	# Only applications the hourly recount would include, so the two agree
+	if in_campaign_window(doc.application_date, get_campaign_routing(campaign)):
+		increment_counters({(campaign, variant_label, "applications"): 1})
+
+
+def evaluate_active_campaigns():
+	"""Scheduled job re-evaluating every running campaign in one pass
+	
+	Applications and views of all active campaigns are recounted with one
+	grouped query each, the running counters are reset to the recounted
+	totals and the live results of all campaigns are written back in bulk.
+	"""
+	
+	campaigns = frappe.get_all(
+		"AB Test Campaign",
+		filters={"status": "Active"},
+		fields=["name", "allocation_mode"]
+	)
+	if not campaigns:
+		return
+	
+	counts = defaultdict(lambda: [0, 0])
+	for campaign, variant, applications, views in get_campaign_counts([c.name for c in campaigns]):
+		counts[(campaign, variant)][0] += cint(applications)
+		counts[(campaign, variant)][1] += cint(views)
+	
+	bandit_campaigns = [c.name for c in campaigns if c.allocation_mode == "Bandit"]
+	arms = get_bandit_arms(bandit_campaigns, counts)
+	
+	updates = {}
+	for campaign in campaigns:
+		if campaign.allocation_mode == "Bandit":
+			updates[campaign.name] = {"leading_variant": get_leading_variant(arms[campaign.name])}
+			continue
+		
+		(a_apps, a_views), (b_apps, b_views) = counts[(campaign.name, "Variant A")], counts[(campaign.name, "Variant B")]
+		updates[campaign.name] = {
+			"variant_a_applications": a_apps,
+			"variant_a_views": a_views,
+			"variant_b_applications": b_apps,
+			"variant_b_views": b_views,
+			**evaluate_counts(a_apps, a_views, b_apps, b_views)
+		}
+	
+	frappe.db.bulk_update("AB Test Campaign", updates, update_modified=False)
+	frappe.db.commit()
+	
+	for campaign in bandit_campaigns:
+		clear_campaign_routing_cache(campaign)
+
+
+def get_bandit_arms(campaigns, counts):
+	"""Write recounted totals to the arms of bandit `campaigns` and return {campaign: arms}"""
+	
+	arms = defaultdict(list)
+	if not campaigns:
+		return arms
+	
+	row_updates = {}
+	for row in frappe.get_all(
+		"AB Test Campaign Variant",
+		filters={"parent": ["in", campaigns], "parenttype": "AB Test Campaign"},
+		fields=["name", "parent", "variant", "job_opening"]
+	):
+		applications, views = counts[(row.parent, row.variant)]
+		row_updates[row.name] = {"applications": applications, "views": views}
+		arms[row.parent].append([row.variant, row.job_opening, applications, views])
+	
+	frappe.db.bulk_update("AB Test Campaign Variant", row_updates, update_modified=False)
+	return arms
+
+
+def get_campaign_counts(campaigns):
+	"""Return (campaign, variant, applications, views) rows for `campaigns`
+	
+	Counts fall within each campaign's own start and end dates, like
+	`ABTestCampaign.get_variant_metrics`.
+	"""
+	
+	return frappe.db.sql("""
+		SELECT c.name, jo.custom_ab_test_variant, COUNT(ja.name), 0
+		FROM `tabAB Test Campaign` c
+		INNER JOIN `tabJob Opening` jo ON jo.custom_ab_test_campaign = c.name
+		INNER JOIN `tabJob Applicant` ja ON ja.job_title = jo.name
+		WHERE c.name IN %(campaigns)s
+			AND ja.application_date >= c.start_date
+			AND (c.end_date IS NULL OR ja.application_date <= c.end_date)
+		GROUP BY c.name, jo.custom_ab_test_variant
+		
+		UNION ALL
+		
+		SELECT c.name, s.variant, 0, SUM(s.views)
+		FROM `tabAB Test Campaign` c
+		INNER JOIN `tabAB Test Variant Stats` s ON s.campaign = c.name
+		WHERE c.name IN %(campaigns)s
+			AND s.day >= c.start_date
+			AND (c.end_date IS NULL OR s.day <= c.end_date)
+		GROUP BY c.name, s.variant
+	""", {"campaigns": tuple(campaigns) or ("",)})
@@ -0,0 +1,177 @@
+import frappe
+from frappe.utils import cint, get_url, now_datetime, today
+from collections import defaultdict
+from urllib.parse import quote
+import hashlib
+
+
+# Redis hash of pending "<day>|<job opening>|<event>" counters
+COUNTER_KEY = "indeed:ab_counters"
+
+# Snapshot of COUNTER_KEY taken by the flush job; kept until written to the database
+FLUSHING_KEY = "indeed:ab_counters:flushing"
+
+VARIANT_JOBS_CACHE_KEY = "indeed:ab_variant_jobs"
+
+TRACKED_EVENTS = ("impression", "view")
+
+# Stats rows written per INSERT statement
+FLUSH_BATCH_SIZE = 500
+
+
+def get_variant_jobs():
+	"""Return {job opening: [campaign, variant]} for campaigns currently running, cached"""
+	
+	return frappe.cache().get_value(VARIANT_JOBS_CACHE_KEY, generator=load_variant_jobs)
+
+
+def load_variant_jobs(job_names=None, active_only=True):
+	"""Read variant job openings and their campaigns from the database"""
+	
+	conditions = ["jo.custom_ab_test_campaign IS NOT NULL"]
+	params = {}
+	
+	if active_only:
+		conditions.append("c.status = 'Active'")
+	
+	if job_names is not None:
+		conditions.append("jo.name IN %(job_names)s")
+		params["job_names"] = tuple(job_names) or ("",)
+	
+	rows = frappe.db.sql(f"""
+		SELECT jo.name, jo.custom_ab_test_campaign, jo.custom_ab_test_variant
+		FROM `tabJob Opening` jo
+		INNER JOIN `tabAB Test Campaign` c ON c.name = jo.custom_ab_test_campaign
+		WHERE {' AND '.join(conditions)}
+	""", params)
+	
+	return {name: [campaign, variant] for name, campaign, variant in rows}
+
+
+def clear_variant_jobs_cache():
+	frappe.cache().delete_value(VARIANT_JOBS_CACHE_KEY)
+
+
+def get_tracking_url(job_name):
+	"""Public URL that counts a view of `job_name` and redirects to its job page"""
+	
+	return f"{get_url()}/api/method/indeed.indeed.ab_tracking.open_job?job={quote(job_name)}"
+
+
+def record_event(job_name, event):
+	"""Count one impression or view of a variant job in Redis
+	
+	Costs one cached lookup and one HINCRBY; nothing is written to the
+	database until `flush_counters` runs. The counter hashes hold plain
+	integers, so they are only accessed through cache methods that do not
+	pickle values, on keys prefixed with `make_key`.
+	"""
+	
+	if event not in TRACKED_EVENTS or not job_name or job_name not in get_variant_jobs():
+		return False
+	
+	cache = frappe.cache()
+	cache.hincrby(cache.make_key(COUNTER_KEY), f"{today()}|{job_name}|{event}", 1)
+	return True
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET", "POST"])
+def track(job=None, event="impression"):
+	"""Beacon endpoint counting an impression or view of a variant job"""
+	
+	record_event(job, event)
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def open_job(job):
+	"""Count a view of a variant job and redirect to its job page"""
+	
+	record_event(job, "view")
+	
+	frappe.local.response["type"] = "redirect"
+	frappe.local.response["location"] = f"/jobs/{quote(job)}"
+
+
+def stats_row_name(day, job_opening):
+	"""Deterministic row name for a (day, job opening) stats key"""
+	
+	return hashlib.md5(f"{day}|{job_opening}".encode()).hexdigest()
+
+
+def flush_counters():
+	"""Scheduled job moving Redis view counters into AB Test Variant Stats
+	
+	The live hash is renamed before it is read, so hits arriving during the
+	flush start a new hash and none are lost. A snapshot left behind by a
+	failed flush is written on the next run before a new one is taken.
+	"""
+	
+	cache = frappe.cache()
+	counter_key = cache.make_key(COUNTER_KEY)
+	flushing_key = cache.make_key(FLUSHING_KEY)
+	
+	# `exists` prefixes its keys itself; `hgetall` would also unpickle the values,
+	# so the snapshot is read with a plain HGETALL
+	if not cache.exists(FLUSHING_KEY):
+		if not cache.exists(COUNTER_KEY):
+			return
+		cache.renamenx(counter_key, flushing_key)
+	
+	counts = defaultdict(lambda: {"impression": 0, "view": 0})
+	for field, value in cache.execute_command("HGETALL", flushing_key).items():
+		day, job_opening, event = frappe.safe_decode(field).rsplit("|", 2)
+		counts[(day, job_opening)][event] += cint(frappe.safe_decode(value))
+	
+	variant_jobs = load_variant_jobs({job_opening for _day, job_opening in counts}, active_only=False)
+	rows = [
+		(stats_row_name(day, job_opening), day, job_opening, variant_jobs[job_opening], events)
+		for (day, job_opening), events in counts.items()
+		if job_opening in variant_jobs
+	]
+	
+	for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+		write_stats_rows(rows[start:start + FLUSH_BATCH_SIZE])
+	
+	update_campaign_view_counters(rows)
+	
+	frappe.db.commit()
+	cache.delete(flushing_key)
+
+
+def update_campaign_view_counters(rows):
+	"""Add flushed views to the running counters of their campaigns"""
+	
+	from indeed.indeed.ab_statistics import increment_counters
+	
+	increments = defaultdict(int)
+	for _name, _day, _job_opening, (campaign, variant), events in rows:
+		increments[(campaign, variant, "views")] += events["view"]
+	
+	increment_counters(increments)
+
+
+def write_stats_rows(rows):
+	"""Add counts to AB Test Variant Stats rows, creating missing rows"""
+	
+	now = now_datetime()
+	user = frappe.session.user
+	values = []
+	params = []
+	
+	for name, day, job_opening, (campaign, variant), events in rows:
+		values.append("(%s, %s, %s, %s, %s, 0, %s, %s, %s, %s, %s, %s)")
+		params.extend([
+			name, now, now, user, user,
+			campaign, variant, job_opening, day, events["impression"], events["view"]
+		])
+	
+	frappe.db.sql(f"""
+		INSERT INTO `tabAB Test Variant Stats`
+			(name, creation, modified, modified_by, owner, docstatus,
+			 campaign, variant, job_opening, day, impressions, views)
+		VALUES {', '.join(values)}
+		ON DUPLICATE KEY UPDATE
+			impressions = impressions + VALUES(impressions),
+			views = views + VALUES(views),
+			modified = VALUES(modified)
+	""", params)
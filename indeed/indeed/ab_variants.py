@@ -0,0 +1,61 @@
+import frappe
+
+
+def get_variant_template(base_job):
+	"""Return the fields a variant copies from `base_job`, computed once per batch
+	
+	The base job goes through `frappe.copy_doc` once, which clears no_copy
+	fields and row names on the parent and every child table row; each
+	variant is then built from the resulting dict.
+	"""
+	
+	template = frappe.copy_doc(base_job).as_dict(no_default_fields=True, no_child_table_fields=True)
+	template.pop("route", None)
+	
+	return template
+
+
+def create_variant_jobs(base_job, variants, campaign=None, post_to_indeed=True):
+	"""Create one Job Opening per variant of `base_job` and post them to Indeed as one batch
+	
+	`variants` is a list of dicts with `title`, `description` and, for AB test
+	variants, `variant` (e.g. "Variant A"). The per-save posting hook is
+	suppressed; the new jobs are posted by a single background job after the
+	transaction commits. Returns the inserted Job Opening documents.
+	"""
+	
+	template = get_variant_template(base_job)
+	jobs = []
+	
+	for variant in variants:
+		job = frappe.get_doc({
+			**template,
+			"doctype": "Job Opening",
+			"job_title": variant["title"],
+			"description": variant["description"],
+			"custom_ab_test_campaign": campaign,
+			"custom_ab_test_variant": variant.get("variant"),
+			"custom_post_to_indeed": 1 if post_to_indeed else 0
+		})
+		job.flags.skip_indeed_posting = True
+		job.insert()
+		jobs.append(job)
+	
+	if post_to_indeed and jobs:
+		frappe.enqueue(
+			"indeed.indeed.ab_variants.post_variant_jobs",
+			queue="default",
+			timeout=600,
+			job_names=[job.name for job in jobs],
+			enqueue_after_commit=True
+		)
+	
+	return jobs
+
+
+def post_variant_jobs(job_names):
+	"""Background job posting newly created variant jobs to Indeed in one batch"""
+	
+	from indeed.indeed.utils import post_jobs_to_indeed
+	
+	post_jobs_to_indeed([frappe.get_doc("Job Opening", name) for name in job_names])
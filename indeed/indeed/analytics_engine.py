@@ -0,0 +1,198 @@
+import frappe
+from frappe import _
+from indeed.indeed.analytics_queries import iter_query_chunks
+from indeed.indeed.cache import apply_default_date_range, get_cached_result, normalize_filters
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+FILTER_FIELDS = ["from_date", "to_date", "company_filter", "job_filter", "source_filter"]
+
+# Applicant rows converted to arrays at a time; bounds peak memory regardless of range
+CHUNK_SIZE = 50000
+
+# Days-to-apply beyond this are counted in the last histogram bin
+MAX_DAYS_TO_APPLY = 3650
+
+PERCENTILES = {"median": 0.5, "p75": 0.75, "p90": 0.9, "p99": 0.99}
+
+
+def require_numpy():
+	if np is None:
+		frappe.throw(_("Exploratory analytics requires NumPy. Install it with `bench pip install numpy`."))
+
+
+class GroupAccumulator:
+	"""Per-group running totals, grown as new group keys appear in later chunks"""
+	
+	def __init__(self):
+		self.index = {}
+		self.totals = np.zeros(0, dtype=np.int64)
+		self.indeed = np.zeros(0, dtype=np.int64)
+		self.days_sum = np.zeros(0, dtype=np.int64)
+		self.days_count = np.zeros(0, dtype=np.int64)
+	
+	def add(self, keys, is_indeed, days, has_days):
+		"""Add one chunk of rows; `keys` is an object array of group keys"""
+		
+		unique_keys, inverse = np.unique(keys, return_inverse=True)
+		
+		# Only the distinct keys of the chunk are mapped in Python
+		codes = np.array([self.index.setdefault(key, len(self.index)) for key in unique_keys], dtype=np.int64)
+		rows = codes[inverse]
+		size = len(self.index)
+		
+		self.totals = self._grow(self.totals, size) + np.bincount(rows, minlength=size)
+		self.indeed = self._grow(self.indeed, size) + np.bincount(rows, weights=is_indeed.astype(np.float64), minlength=size).astype(np.int64)
+		self.days_sum = self._grow(self.days_sum, size) + np.bincount(
+			rows[has_days], weights=days[has_days], minlength=size
+		).astype(np.int64)
+		self.days_count = self._grow(self.days_count, size) + np.bincount(rows[has_days], minlength=size)
+	
+	@staticmethod
+	def _grow(array, size):
+		return np.pad(array, (0, size - len(array)))
+	
+	def to_list(self, key_field, limit=None):
+		"""Return groups as dicts, largest first"""
+		
+		keys = np.empty(len(self.index), dtype=object)
+		for key, code in self.index.items():
+			keys[code] = key
+		
+		share = np.divide(self.indeed * 100.0, self.totals, out=np.zeros(len(keys)), where=self.totals > 0)
+		avg_days = np.divide(self.days_sum, self.days_count, out=np.zeros(len(keys)), where=self.days_count > 0)
+		order = np.argsort(-self.totals, kind="stable")[:limit]
+		
+		return [
+			{
+				key_field: keys[i],
+				"total_applications": int(self.totals[i]),
+				"indeed_applications": int(self.indeed[i]),
+				"indeed_share": round(float(share[i]), 1),
+				"avg_time_to_apply": round(float(avg_days[i]), 1)
+			}
+			for i in order
+		]
+
+
+def histogram_percentile(counts, q):
+	"""Continuous percentile `q` of values 0..n-1 occurring `counts` times
+	
+	Interpolates like SQL PERCENTILE_CONT over the expanded values.
+	"""
+	
+	cumulative = np.cumsum(counts)
+	total = int(cumulative[-1]) if len(cumulative) else 0
+	if not total:
+		return 0.0
+	
+	rank = q * (total - 1)
+	lower_rank = int(rank)
+	upper_rank = min(lower_rank + 1, total - 1)
+	
+	lower, upper = np.searchsorted(cumulative, [lower_rank, upper_rank], side="right")
+	return float(lower + (upper - lower) * (rank - lower_rank))
+
+
+def get_applicant_query(filters):
+	"""Return (query, params) selecting the columns the engine needs for a filter set"""
+	
+	conditions = [
+		"ja.creation >= %(from_date)s",
+		"ja.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)"
+	]
+	params = {"from_date": filters.from_date, "to_date": filters.to_date}
+	
+	if filters.company_filter:
+		conditions.append("jo.company = %(company)s")
+		params["company"] = filters.company_filter
+	
+	if filters.job_filter:
+		conditions.append("ja.job_title = %(job)s")
+		params["job"] = filters.job_filter
+	
+	if filters.source_filter:
+		conditions.append("ja.source = %(source)s")
+		params["source"] = filters.source_filter
+	
+	query = f"""
+		SELECT
+			IFNULL(ja.job_title, '') AS job_opening,
+			IFNULL(ja.source, 'Unknown') AS source,
+			DATEDIFF(ja.creation, jo.creation) AS days_to_apply
+		FROM `tabJob Applicant` ja
+		LEFT JOIN `tabJob Opening` jo ON jo.name = ja.job_title
+		WHERE {' AND '.join(conditions)}
+	"""
+	
+	return query, params
+
+
+def compute_application_analytics(filters, chunk_size=CHUNK_SIZE, top_jobs=50):
+	"""Compute totals, time-to-apply percentiles and per-job / per-source breakdowns
+	
+	Applicants are read from one streamed query and converted chunk by chunk
+	into NumPy arrays that are reduced into running totals and a days-to-apply
+	histogram, so memory depends on the chunk size and the number of groups,
+	not on the number of applicants.
+	"""
+	
+	require_numpy()
+	
+	filters = frappe._dict(filters)
+	query, params = get_applicant_query(filters)
+	
+	days_histogram = np.zeros(MAX_DAYS_TO_APPLY + 1, dtype=np.int64)
+	by_job = GroupAccumulator()
+	by_source = GroupAccumulator()
+	total = indeed = 0
+	
+	for chunk in iter_query_chunks(query, params, chunk_size):
+		jobs, sources, days = (np.array(column, dtype=object) for column in zip(*chunk))
+		
+		is_indeed = sources == "Indeed"
+		has_days = days != None  # noqa: E711 - element-wise comparison
+		days = np.where(has_days, days, 0).astype(np.int64)
+		has_days &= days >= 0
+		
+		total += len(chunk)
+		indeed += int(is_indeed.sum())
+		days_histogram += np.bincount(np.minimum(days[has_days], MAX_DAYS_TO_APPLY), minlength=MAX_DAYS_TO_APPLY + 1)
+		
+		by_job.add(jobs, is_indeed, days, has_days)
+		by_source.add(sources, is_indeed, days, has_days)
+	
+	days_count = int(days_histogram.sum())
+	avg_days = float(np.dot(days_histogram, np.arange(len(days_histogram)))) / days_count if days_count else 0.0
+	
+	time_to_apply = {"avg": round(avg_days, 1), "count": days_count}
+	for name, q in PERCENTILES.items():
+		time_to_apply[name] = round(histogram_percentile(days_histogram, q), 1)
+	
+	return {
+		"total_applications": total,
+		"indeed_applications": indeed,
+		"conversion_rate": round(indeed * 100.0 / total, 1) if total else 0,
+		"time_to_apply": time_to_apply,
+		"jobs": by_job.to_list("job_opening", limit=top_jobs),
+		"sources": by_source.to_list("source")
+	}
+
+
+@frappe.whitelist()
+def get_exploratory_analytics(filters=None):
+	"""Return application analytics computed from raw applicants for long ranges"""
+	
+	frappe.has_permission("Application Analytics", "read", throw=True)
+	require_numpy()
+	
+	filters = apply_default_date_range(normalize_filters(filters, FILTER_FIELDS))
+	return get_cached_result(
+		"exploratory_analytics", filters,
+		lambda: compute_application_analytics(filters),
+		scope="applications"
+	)
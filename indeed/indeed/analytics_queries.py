@@ -0,0 +1,214 @@
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, cint, date_diff, getdate
+from itertools import islice
+
+
+# SQL expressions mapping a rollup day to the first day of its bucket
+BUCKET_EXPRESSIONS = {
+	"day": "r.day",
+	"week": "DATE_SUB(r.day, INTERVAL WEEKDAY(r.day) DAY)",
+	"month": "DATE_SUB(r.day, INTERVAL DAYOFMONTH(r.day) - 1 DAY)"
+}
+
+BUCKET_DAYS = {"day": 1, "week": 7, "month": 28}
+
+# Upper bound on points returned by one series request
+MAX_SERIES_POINTS = 3000
+
+# Rows held in memory at once when streaming a query
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def iter_query_chunks(query, params=None, chunk_size=DEFAULT_CHUNK_SIZE, as_dict=False):
+	"""Run `query` on an unbuffered cursor and yield its rows in lists of `chunk_size`
+	
+	Rows are streamed from the database server instead of being loaded all at
+	once. Nothing else may use the database connection until the generator is
+	exhausted or closed.
+	"""
+	
+	with frappe.db.unbuffered_cursor():
+		rows = frappe.db.sql(query, params, as_dict=as_dict, as_iterator=True)
+		
+		while True:
+			chunk = list(islice(rows, chunk_size))
+			if not chunk:
+				return
+			yield chunk
+
+
+def get_rollup_conditions(filters, alias="r", include_source=False):
+	"""Return (where clause, named params) selecting rollup rows for a filter set
+	
+	Filter values only ever travel as parameters, so the statement text depends
+	on which filters are set and not on their values. Company filtering uses the
+	rollup's own company column rather than a Job Opening subquery.
+	"""
+	
+	filters = frappe._dict(filters)
+	prefix = f"{alias}." if alias else ""
+	
+	conditions = [f"{prefix}day BETWEEN %(from_date)s AND %(to_date)s"]
+	params = {
+		"from_date": getdate(filters.from_date),
+		"to_date": getdate(filters.to_date)
+	}
+	
+	if filters.company_filter:
+		conditions.append(f"{prefix}company = %(company)s")
+		params["company"] = filters.company_filter
+	
+	if filters.job_filter:
+		conditions.append(f"{prefix}job_opening = %(job)s")
+		params["job"] = filters.job_filter
+	
+	if include_source and filters.source_filter:
+		conditions.append(f"{prefix}source = %(source)s")
+		params["source"] = filters.source_filter
+	
+	return " AND ".join(conditions), params
+
+
+def get_application_totals(filters):
+	"""Return total and Indeed-sourced application counts for a filter set"""
+	
+	where, params = get_rollup_conditions(filters, include_source=True)
+	
+	return frappe.db.sql(f"""
+		SELECT
+			COALESCE(SUM(r.applications), 0) AS total_applications,
+			COALESCE(SUM(CASE WHEN r.source = 'Indeed' THEN r.applications ELSE 0 END), 0) AS indeed_applications
+		FROM `tabApplication Daily Rollup` r
+		WHERE {where}
+	""", params, as_dict=True)[0]
+
+
+def get_time_to_apply_histogram(filters):
+	"""Return [(days to apply, applications), ...] sorted by days"""
+	
+	where, params = get_rollup_conditions(filters, include_source=True)
+	
+	return frappe.db.sql(f"""
+		SELECT
+			DATEDIFF(r.day, r.job_created_on) AS days,
+			SUM(r.applications) AS applications
+		FROM `tabApplication Daily Rollup` r
+		WHERE {where} AND r.job_created_on IS NOT NULL
+		GROUP BY days
+		HAVING days >= 0
+		ORDER BY days
+	""", params)
+
+
+def get_source_breakdown(filters):
+	"""Return applications and share per source"""
+	
+	where, params = get_rollup_conditions(filters)
+	
+	return frappe.db.sql(f"""
+		SELECT
+			COALESCE(r.source, 'Unknown') AS source,
+			SUM(r.applications) AS applications,
+			SUM(r.applications) * 100.0 / SUM(SUM(r.applications)) OVER () AS percentage
+		FROM `tabApplication Daily Rollup` r
+		WHERE {where}
+		GROUP BY r.source
+		ORDER BY applications DESC
+	""", params, as_dict=True)
+
+
+def get_top_jobs(filters, limit=10):
+	"""Return the job openings posted in the window with the most applications
+	
+	Applications are aggregated per job opening first; only the top rows are
+	then joined to Job Opening for their titles.
+	"""
+	
+	where, params = get_rollup_conditions(filters)
+	params["limit"] = limit
+	
+	return frappe.db.sql(f"""
+		SELECT
+			jo.job_title,
+			jo.name AS job_id,
+			perf.total_applications,
+			perf.indeed_applications,
+			jo.creation AS job_posted_date
+		FROM (
+			SELECT
+				r.job_opening,
+				SUM(r.applications) AS total_applications,
+				SUM(CASE WHEN r.source = 'Indeed' THEN r.applications ELSE 0 END) AS indeed_applications
+			FROM `tabApplication Daily Rollup` r
+			WHERE {where}
+				AND r.job_created_on BETWEEN %(from_date)s AND %(to_date)s
+			GROUP BY r.job_opening
+			ORDER BY total_applications DESC
+			LIMIT %(limit)s
+		) perf
+		INNER JOIN `tabJob Opening` jo ON jo.name = perf.job_opening
+		ORDER BY perf.total_applications DESC
+	""", params, as_dict=True)
+
+
+def get_application_buckets(filters, bucket):
+	"""Return {bucket start: (total, indeed)} for buckets holding applications"""
+	
+	where, params = get_rollup_conditions(filters, include_source=True)
+	bucket_start = BUCKET_EXPRESSIONS[bucket]
+	
+	rows = frappe.db.sql(f"""
+		SELECT
+			{bucket_start} AS bucket_start,
+			SUM(r.applications) AS total_apps,
+			SUM(CASE WHEN r.source = 'Indeed' THEN r.applications ELSE 0 END) AS indeed_apps
+		FROM `tabApplication Daily Rollup` r
+		WHERE {where}
+		GROUP BY bucket_start
+	""", params)
+	
+	return {getdate(start): (cint(total), cint(indeed)) for start, total, indeed in rows}
+
+
+def get_bucket_start(day, bucket):
+	"""Return the first day of the `bucket` containing `day`"""
+	
+	day = getdate(day)
+	
+	if bucket == "week":
+		return add_days(day, -day.weekday())
+	if bucket == "month":
+		return day.replace(day=1)
+	return day
+
+
+def get_application_series(filters, bucket="week"):
+	"""Return application totals per day, week or month as parallel arrays
+	
+	Every bucket between from_date and to_date is present, with zeros for
+	buckets without applications, so the arrays can be charted directly.
+	Weeks start on Monday and buckets are labelled by their first day.
+	"""
+	
+	if bucket not in BUCKET_EXPRESSIONS:
+		frappe.throw(_("Invalid bucket {0}").format(bucket))
+	
+	filters = frappe._dict(filters)
+	start = get_bucket_start(filters.from_date, bucket)
+	end = getdate(filters.to_date)
+	
+	if date_diff(end, start) // BUCKET_DAYS[bucket] > MAX_SERIES_POINTS:
+		frappe.throw(_("Date range is too long for {0} buckets, please choose a larger bucket").format(bucket))
+	
+	buckets = get_application_buckets(filters, bucket)
+	series = {"bucket": bucket, "timestamps": [], "totals": [], "indeed": []}
+	
+	while start <= end:
+		total, indeed = buckets.get(start, (0, 0))
+		series["timestamps"].append(str(start))
+		series["totals"].append(total)
+		series["indeed"].append(indeed)
+		start = add_months(start, 1) if bucket == "month" else add_days(start, BUCKET_DAYS[bucket])
+	
+	return series
@@ -0,0 +1,187 @@
+import frappe
+from frappe.utils import getdate, add_days, add_months, add_to_date, now_datetime, cint, flt
+import hashlib
+from indeed.indeed.cache import bump_generation
+
+
+# Global default holding the `modified` high-water mark of the last sync
+WATERMARK_KEY = "indeed_application_rollup_watermark"
+
+# The watermark trails the sync start by this much, so rows of transactions
+# still in flight are picked up again on the next run instead of skipped
+WATERMARK_SETTLE_SECONDS = 60
+
+
+def rollup_name(day, job_opening, source):
+	"""Deterministic row name for a (day, job opening, source) rollup key
+	
+	Must match the MD5 expression used in `rebuild_rollup_range`.
+	"""
+	
+	key = f"{getdate(day)}|{job_opening or ''}|{source or ''}"
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def weighted_percentile(histogram, q):
+	"""Continuous percentile `q` of a sorted [(value, count), ...] histogram
+	
+	Interpolates like SQL PERCENTILE_CONT over the expanded values.
+	"""
+	
+	histogram = [(flt(value), cint(count)) for value, count in histogram if cint(count) > 0]
+	total = sum(count for _value, count in histogram)
+	if not total:
+		return 0
+	
+	rank = q * (total - 1)
+	lower_rank = int(rank)
+	upper_rank = min(lower_rank + 1, total - 1)
+	
+	lower = upper = None
+	seen = 0
+	for value, count in histogram:
+		seen += count
+		if lower is None and lower_rank < seen:
+			lower = value
+		if upper_rank < seen:
+			upper = value
+			break
+	
+	return lower + (upper - lower) * (rank - lower_rank)
+
+
+def increment_rollup(doc, method=None):
+	"""Job Applicant after_insert hook: count the new application"""
+	
+	company = job_created_on = None
+	
+	if doc.job_title:
+		job = frappe.db.get_value("Job Opening", doc.job_title, ["company", "creation"], as_dict=True)
+		if job:
+			company = job.company
+			job_created_on = getdate(job.creation)
+	
+	frappe.db.sql("""
+		INSERT INTO `tabApplication Daily Rollup`
+			(name, creation, modified, modified_by, owner, docstatus,
+			 day, company, job_opening, source, job_created_on, applications)
+		VALUES
+			(%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0,
+			 %(day)s, %(company)s, %(job_opening)s, %(source)s, %(job_created_on)s, 1)
+		ON DUPLICATE KEY UPDATE
+			applications = applications + 1,
+			modified = VALUES(modified)
+	""", {
+		"name": rollup_name(doc.creation, doc.job_title, doc.source),
+		"now": now_datetime(),
+		"user": frappe.session.user,
+		"day": getdate(doc.creation),
+		"company": company,
+		"job_opening": doc.job_title,
+		"source": doc.source,
+		"job_created_on": job_created_on
+	})
+
+
+def refresh_rollup_for_applicant(doc, method=None):
+	"""Job Applicant on_update / after_delete hook
+	
+	Rebuilds the applicant's day when it was deleted or moved to another job
+	opening or source, since its old rollup row can no longer be decremented
+	reliably.
+	"""
+	
+	if method == "on_update":
+		before = doc.get_doc_before_save()
+		if not before or (before.job_title == doc.job_title and before.source == doc.source):
+			return
+	
+	refresh_rollup_days([doc.creation])
+
+
+def refresh_rollup_days(days):
+	"""Rebuild the rollup rows of the given days from Job Applicant"""
+	
+	for day in sorted({getdate(day) for day in days if day}):
+		rebuild_rollup_range(day, add_days(day, 1))
+
+
+def rebuild_rollup_range(from_day, to_day):
+	"""Replace rollup rows for days in [from_day, to_day) with fresh aggregates"""
+	
+	frappe.db.sql("""
+		DELETE FROM `tabApplication Daily Rollup`
+		WHERE day >= %(from_day)s AND day < %(to_day)s
+	""", {"from_day": from_day, "to_day": to_day})
+	
+	frappe.db.sql("""
+		INSERT INTO `tabApplication Daily Rollup`
+			(name, creation, modified, modified_by, owner, docstatus,
+			 day, company, job_opening, source, job_created_on, applications)
+		SELECT
+			MD5(CONCAT(DATE(ja.creation), '|', IFNULL(ja.job_title, ''), '|', IFNULL(ja.source, ''))),
+			%(now)s, %(now)s, %(user)s, %(user)s, 0,
+			DATE(ja.creation), MAX(jo.company), ja.job_title, ja.source, MAX(DATE(jo.creation)),
+			COUNT(*)
+		FROM `tabJob Applicant` ja
+		LEFT JOIN `tabJob Opening` jo ON jo.name = ja.job_title
+		WHERE ja.creation >= %(from_day)s AND ja.creation < %(to_day)s
+		GROUP BY DATE(ja.creation), ja.job_title, ja.source
+	""", {
+		"from_day": from_day,
+		"to_day": to_day,
+		"now": now_datetime(),
+		"user": frappe.session.user
+	})
+
+
+def rebuild_rollup():
+	"""Rebuild the whole rollup from Job Applicant, one month at a time"""
+	
+	first = frappe.db.sql("SELECT MIN(creation) FROM `tabJob Applicant`")[0][0]
+	if not first:
+		return
+	
+	start = getdate(first).replace(day=1)
+	end = add_days(getdate(now_datetime()), 1)
+	
+	while start < end:
+		month_end = add_months(start, 1)
+		rebuild_rollup_range(start, month_end)
+		frappe.db.commit()
+		start = month_end
+
+
+def sync_application_rollup():
+	"""Scheduled catch-up for changes made without document hooks
+	
+	Rebuilds days with applicants modified since the last run and refreshes
+	company / posting dates of job openings modified since then. Runs
+	overlap by WATERMARK_SETTLE_SECONDS; rebuilding a day is idempotent.
+	"""
+	
+	watermark = frappe.db.get_global(WATERMARK_KEY)
+	started_at = add_to_date(now_datetime(), seconds=-WATERMARK_SETTLE_SECONDS)
+	
+	if not watermark:
+		rebuild_rollup()
+	else:
+		days = frappe.db.sql_list("""
+			SELECT DISTINCT DATE(creation)
+			FROM `tabJob Applicant`
+			WHERE modified >= %s
+		""", watermark)
+		refresh_rollup_days(days)
+		
+		frappe.db.sql("""
+			UPDATE `tabApplication Daily Rollup` r
+			INNER JOIN `tabJob Opening` jo ON jo.name = r.job_opening
+			SET r.company = jo.company, r.job_created_on = DATE(jo.creation)
+			WHERE jo.modified >= %s
+		""", watermark)
+	
+	frappe.db.set_global(WATERMARK_KEY, str(started_at))
+	frappe.db.commit()
+	
+	# Rows rebuilt here may have been missed by the document hooks
+	bump_generation("applications")
@@ -212,7 +212,7 @@ def get_integration_stats():
 
 @frappe.whitelist()
 def sync_job_status_with_indeed(job_opening_name):
-	"""Sync job status with Indeed (placeholder for API integration)"""
+	"""Sync one job with Indeed: send an update if its payload changed, expire it if it was closed"""
 	
 	if not frappe.has_permission("Job Opening", "write"):
 		frappe.throw(_("Insufficient permissions"))
@@ -226,14 +226,23 @@ def sync_job_status_with_indeed(job_opening_name):
 				"message": "No Indeed Job ID found for this posting"
 			}
 		
-		# TODO: Implement actual status sync with Indeed API
-		# For now, just update the last sync date
-		integration.last_sync_date = frappe.utils.now()
-		integration.save()
+		from indeed.indeed.sync import sync_job_openings
+		
+		summary = sync_job_openings([job_opening_name])
+		integration.reload()
+		
+		if summary["failed"]:
+			return {
+				"success": False,
+				"message": "Status sync failed",
+				"error": integration.error_message
+			}
 		
 		return {
 			"success": True,
 			"message": "Status sync completed",
+			"status": integration.status,
+			"summary": summary,
 			"last_sync": integration.last_sync_date
 		}
 		
@@ -1,44 +1,141 @@
 import frappe
 from frappe import _
-from frappe.utils import now_datetime, cstr
+from frappe.utils import now_datetime, cstr, cint
 import json
+from indeed.indeed.cache import bump_generation
+
+
+# Selections larger than this run as a background job; operations that call
+# Indeed always do, since the rate limited API calls outlast a web request
+BACKGROUND_THRESHOLD = 100
 
 
 @frappe.whitelist()
-def execute_bulk_operation(job_names, operation, new_status=None, indeed_action=None):
-	"""Execute bulk operations on selected jobs"""
+def execute_bulk_operation(job_names=None, operation=None, new_status=None, indeed_action=None,
+	select_all=0, filters=None):
+	"""Execute bulk operations on selected jobs
+	
+	Jobs are either passed explicitly as `job_names`, or, with `select_all`,
+	described by the Bulk Job Manager selection `filters` and resolved on the
+	server in keyset-paginated batches.
+	"""
+	
+	from indeed.indeed.doctype.bulk_job_manager.bulk_job_manager import (
+		count_matching_jobs, parse_selection_filters
+	)
+	
+	if cint(select_all):
+		job_names = None
+		filters = parse_selection_filters(filters)
+		total = count_matching_jobs(filters)
+	else:
+		if isinstance(job_names, str):
+			job_names = json.loads(job_names)
+		job_names = job_names or []
+		total = len(job_names)
+	
+	if total > BACKGROUND_THRESHOLD or calls_indeed(operation, indeed_action, new_status):
+		frappe.enqueue(
+			"indeed.indeed.bulk_operations.run_bulk_operation_in_background",
+			queue="long",
+			timeout=7200,
+			job_names=job_names,
+			operation=operation,
+			new_status=new_status,
+			indeed_action=indeed_action,
+			filters=filters,
+			user=frappe.session.user
+		)
+		
+		return {
+			"success": True,
+			"queued": True,
+			"summary": f"Bulk operation on {total} jobs queued; results will be posted when it completes",
+			"results": "",
+			"details": []
+		}
+	
+	return run_bulk_operation(job_names, operation, new_status, indeed_action, filters)
+
+
+def calls_indeed(operation, indeed_action, new_status=None):
+	"""Whether an operation posts jobs to or expires jobs on Indeed"""
+	
+	if operation == "Remove from Indeed":
+		return True
+	
+	# Closing jobs expires them on Indeed
+	if operation == "Update Job Status" and new_status == "Closed":
+		return True
+	
+	return operation == "Post to Indeed" and indeed_action in ("Enable Indeed Posting", "Disable Indeed Posting")
+
+
+def run_bulk_operation_in_background(operation, new_status, indeed_action, filters, user, job_names=None):
+	"""Run a queued bulk operation and report back to the user"""
 	
-	if isinstance(job_names, str):
-		job_names = json.loads(job_names)
+	result = run_bulk_operation(job_names, operation, new_status, indeed_action, filters)
+	
+	frappe.db.set_single_value("Bulk Job Manager", "operation_results", result["results"])
+	frappe.db.commit()
+	
+	frappe.publish_realtime(
+		"indeed_bulk_operation_complete",
+		{"summary": result["summary"], "success": result["success"]},
+		user=user
+	)
+
+
+def run_bulk_operation(job_names, operation, new_status=None, indeed_action=None, filters=None):
+	"""Apply an operation to `job_names`, or to every job matching `filters`"""
+	
+	from indeed.indeed.doctype.bulk_job_manager.bulk_job_manager import iter_matching_job_batches
+	
+	if job_names is None:
+		batches = iter_matching_job_batches(filters)
+	else:
+		batches = [job_names]
 	
 	results = []
-	success_count = 0
-	error_count = 0
 	
-	for job_name in job_names:
-		try:
-			result = process_single_job(job_name, operation, new_status, indeed_action)
-			results.append(result)
+	# Batch-level side effects (feed rebuilds, Indeed posting) are collected
+	# here and applied once after the jobs have been processed
+	deferred = new_deferred_side_effects()
+	
+	for batch in batches:
+		for job_name in batch:
+			try:
+				result = process_single_job(job_name, operation, new_status, indeed_action, deferred)
+				results.append(result)
 			
-			if result["success"]:
-				success_count += 1
-			else:
-				error_count += 1
-				
-		except Exception as e:
-			error_result = {
-				"job": job_name,
-				"success": False,
-				"message": f"Error: {str(e)}"
-			}
-			results.append(error_result)
-			error_count += 1
+			except Exception as e:
+				error_result = {
+					"job": job_name,
+					"success": False,
+					"message": f"Error: {str(e)}"
+				}
+				results.append(error_result)
+		
+		# Commit each batch and post its jobs so memory stays bounded
+		frappe.db.commit()
+		flush_deferred_posts(deferred)
 	
-	# Commit all changes
-	frappe.db.commit()
+	# Run deferred side effects once for the whole operation
+	feed_result = run_deferred_side_effects(deferred)
+	
+	# Cached selection counts no longer match the changed jobs
+	bump_generation("jobs")
+	
+	success_count = len([r for r in results if r["success"]])
+	error_count = len(results) - success_count
 	
 	# Prepare summary
 	summary = f"Operation completed: {success_count} successful, {error_count} errors"
+	if feed_result is not None:
+		if feed_result.get("success"):
+			summary += "; XML feed regenerated"
+		else:
+			summary += f"; XML feed regeneration failed: {feed_result.get('error', 'Unknown error')}"
 	
 	# Format results for display
 	results_text = "\n".join([
@@ -53,8 +150,100 @@ def execute_bulk_operation(job_names, operation, new_status=None, indeed_action=
 	}
 
 
-def process_single_job(job_name, operation, new_status=None, indeed_action=None):
-	"""Process a single job with the specified operation"""
+def new_deferred_side_effects():
+	"""Container for side effects deferred until the end of a bulk operation"""
+	
+	return frappe._dict({
+		"regenerate_xml_feed": False,
+		"post_to_indeed": [],  # (job opening doc, result dict) pairs
+		"expire_on_indeed": []  # (job opening name, result dict) pairs
+	})
+
+
+def process_single_job(job_name, operation, new_status=None, indeed_action=None, deferred=None):
+	"""Process a single job with the specified operation
+	
+	Side effects that act on the whole batch (regenerating the XML feed, posting
+	to Indeed) are recorded on `deferred` instead of being run per job. When no
+	container is passed in, they are applied immediately.
+	"""
+	
+	run_now = deferred is None
+	if run_now:
+		deferred = new_deferred_side_effects()
+	
+	result = _process_single_job(job_name, operation, new_status, indeed_action, deferred)
+	
+	if run_now:
+		run_deferred_side_effects(deferred)
+	
+	return result
+
+
+def flush_deferred_posts(deferred):
+	"""Post and expire the jobs queued on `deferred` on Indeed, one batch each
+	
+	The outcome for each job is written back into its per-job result dict.
+	"""
+	
+	flush_deferred_expiries(deferred)
+	
+	if not deferred.post_to_indeed:
+		return
+	
+	from indeed.indeed.utils import post_jobs_to_indeed
+	
+	responses = post_jobs_to_indeed([job for job, _result in deferred.post_to_indeed])
+	
+	for job, result in deferred.post_to_indeed:
+		response = responses.get(job.name, {})
+		if response.get("success"):
+			result.update({"success": True, "message": "Enabled and posted to Indeed"})
+		else:
+			result.update({
+				"success": False,
+				"message": f"Enabled but posting failed: {response.get('error', 'Unknown error')}"
+			})
+	
+	deferred.post_to_indeed = []
+
+
+def flush_deferred_expiries(deferred):
+	"""Take the jobs queued on `deferred` off Indeed with one batched expire"""
+	
+	if not deferred.expire_on_indeed:
+		return
+	
+	from indeed.indeed.sync import expire_job_openings
+	
+	errors = expire_job_openings([job_name for job_name, _result in deferred.expire_on_indeed])["errors"]
+	
+	for job_name, result in deferred.expire_on_indeed:
+		if job_name in errors:
+			result.update({"success": False, "message": f"Expiring on Indeed failed: {errors[job_name]}"})
+		else:
+			result["success"] = True
+	
+	deferred.expire_on_indeed = []
+
+
+def run_deferred_side_effects(deferred):
+	"""Apply side effects collected while processing a batch of jobs
+	
+	Returns the XML feed regeneration result, or None if the feed was untouched.
+	"""
+	
+	flush_deferred_posts(deferred)
+	
+	if not deferred.regenerate_xml_feed:
+		return None
+	
+	from indeed.indeed.utils import regenerate_xml_feed
+	return regenerate_xml_feed()
+
+
+def _process_single_job(job_name, operation, new_status, indeed_action, deferred):
+	"""Apply the operation to one job, recording batch-level work on `deferred`"""
 	
 	job = frappe.get_doc("Job Opening", job_name)
 	
@@ -64,51 +253,62 @@ def process_single_job(job_name, operation, new_status=None, indeed_action=None)
 		
 		old_status = job.status
 		job.status = new_status
+		# Closed jobs are expired below as part of the batch; other changes reach Indeed with the next sync
+		job.flags.skip_indeed_posting = True
 		job.save()
 		
-		return {
+		result = {
 			"job": job_name,
 			"success": True,
 			"message": f"Status updated from {old_status} to {new_status}"
 		}
+		
+		if new_status == "Closed":
+			result["success"] = False
+			deferred.expire_on_indeed.append((job_name, result))
+		
+		return result
 	
 	elif operation == "Post to Indeed":
 		if indeed_action == "Enable Indeed Posting":
 			job.custom_post_to_indeed = 1
+			# Posted below as part of the batch, so skip the per-save enqueue
+			job.flags.skip_indeed_posting = True
 			job.save()
 			
-			# Trigger Indeed posting
-			from indeed.indeed.utils import post_job_to_indeed
-			success = post_job_to_indeed(job)
+			# Indeed posting runs once for the whole batch; the result is filled in then
+			result = {"job": job_name, "success": False, "message": "Posting pending"}
+			deferred.post_to_indeed.append((job, result))
 			
-			if success:
-				return {"job": job_name, "success": True, "message": "Enabled and posted to Indeed"}
-			else:
-				return {"job": job_name, "success": False, "message": "Enabled but posting failed"}
+			return result
 		
 		elif indeed_action == "Disable Indeed Posting":
 			job.custom_post_to_indeed = 0
+			# Expired below as part of the batch, so skip the per-save enqueue
+			job.flags.skip_indeed_posting = True
 			job.save()
 			
-			# Remove from Indeed feed
-			remove_from_indeed_feed(job_name)
+			result = {"job": job_name, "success": False, "message": "Disabled Indeed posting"}
+			deferred.expire_on_indeed.append((job_name, result))
 			
-			return {"job": job_name, "success": True, "message": "Disabled Indeed posting"}
+			return result
 		
 		elif indeed_action == "Force Refresh":
-			# Force regenerate XML feed
-			from indeed.indeed.utils import regenerate_xml_feed
-			regenerate_xml_feed()
+			# The feed is rebuilt once after the whole batch
+			deferred.regenerate_xml_feed = True
 			
-			return {"job": job_name, "success": True, "message": "XML feed refreshed"}
+			return {"job": job_name, "success": True, "message": "Queued for XML feed refresh"}
 	
 	elif operation == "Remove from Indeed":
-		# Remove job from Indeed integration
-		remove_from_indeed_feed(job_name)
+		# Expired on Indeed and removed from the feed with the rest of the batch
 		job.custom_post_to_indeed = 0
+		job.flags.skip_indeed_posting = True
 		job.save()
 		
-		return {"job": job_name, "success": True, "message": "Removed from Indeed feed"}
+		result = {"job": job_name, "success": False, "message": "Removed from Indeed feed"}
+		deferred.expire_on_indeed.append((job_name, result))
+		
+		return result
 	
 	elif operation == "Export Selected":
 		# This would typically generate a file download
@@ -118,78 +318,16 @@ def process_single_job(job_name, operation, new_status=None, indeed_action=None)
 		return {"job": job_name, "success": False, "message": f"Unknown operation: {operation}"}
 
 
-def remove_from_indeed_feed(job_name):
-	"""Remove job from Indeed integration"""
+@frappe.whitelist()
+def export_integration_report(from_date=None, to_date=None, compress=0, file_format="csv"):
+	"""Export comprehensive integration report
 	
-	# Find and update Indeed job integration record
-	integration = frappe.db.get_value(
-		"Indeed Job Integration",
-		{"job_opening": job_name},
-		["name"]
-	)
+	The report is streamed to a private file by a background job, as CSV
+	(optionally gzipped) or Parquet, and the user is notified when it is ready.
+	"""
 	
-	if integration:
-		integration_doc = frappe.get_doc("Indeed Job Integration", integration)
-		integration_doc.status = "Removed"
-		integration_doc.save()
-
-
-@frappe.whitelist()
-def export_integration_report(from_date=None, to_date=None):
-	"""Export comprehensive integration report"""
-	
-	from frappe.utils import get_url
-	import csv
-	import os
-	
-	# Set default dates
-	if not from_date:
-		from_date = frappe.utils.add_days(frappe.utils.now_datetime(), -30)
-	if not to_date:
-		to_date = frappe.utils.now_datetime()
-	
-	# Get comprehensive data
-	data = frappe.db.sql("""
-		SELECT 
-			jo.name as job_id,
-			jo.job_title,
-			jo.company,
-			jo.department,
-			jo.status as job_status,
-			jo.creation as job_created,
-			iji.status as indeed_status,
-			iji.creation as indeed_posted,
-			iji.posted_date,
-			iji.error_message,
-			COUNT(ja.name) as applications,
-			COUNT(CASE WHEN ja.source = 'Indeed' THEN 1 END) as indeed_applications
-		FROM `tabJob Opening` jo
-		LEFT JOIN `tabIndeed Job Integration` iji ON iji.job_opening = jo.name
-		LEFT JOIN `tabJob Applicant` ja ON ja.job_title = jo.name
-		WHERE jo.creation BETWEEN %s AND %s
-		GROUP BY jo.name, jo.job_title, jo.company, jo.department, 
-				 jo.status, jo.creation, iji.status, iji.creation, 
-				 iji.posted_date, iji.error_message
-		ORDER BY jo.creation DESC
-	""", [from_date, to_date], as_dict=True)
-	
-	# Create CSV file
-	filename = f"indeed_integration_report_{frappe.utils.now_datetime().strftime('%Y%m%d_%H%M%S')}.csv"
-	filepath = os.path.join(frappe.utils.get_site_path(), "public", "files", filename)
-	
-	with open(filepath, 'w', newline='') as csvfile:
-		if data:
-			fieldnames = data[0].keys()
-			writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-			writer.writeheader()
-			writer.writerows(data)
-	
-	# Return download URL
-	download_url = get_url() + f"/files/{filename}"
+	from indeed.indeed.exports import enqueue_export
 	
-	return {
-		"success": True,
-		"download_url": download_url,
-		"filename": filename,
-		"record_count": len(data)
-	}
\ No newline at end of file
+	frappe.has_permission("Indeed Job Integration", "read", throw=True)
+	
+	return enqueue_export("integrations", from_date, to_date, file_format, compress)
@@ -0,0 +1,152 @@
+import frappe
+from frappe.utils import add_days, cint, cstr, getdate, today
+from redis.exceptions import LockError
+import hashlib
+import json
+
+
+# Seconds a computed dashboard result is reused for the same filter set
+DEFAULT_TTL = 300
+
+# Length of the reporting window used when no dates are given
+DEFAULT_RANGE_DAYS = 30
+
+# Seconds a request waits for another worker computing the same result
+COMPUTE_LOCK_TIMEOUT = 30
+
+# Seconds the compute lock is held at most; longer than the slowest computation
+COMPUTE_LOCK_TTL = 600
+
+
+def normalize_filters(filters, allowed):
+	"""Keep only the `allowed` filter keys that carry a value
+	
+	Date filters are reduced to ISO dates and other values to trimmed strings,
+	so equivalent filter sets produce the same cache key.
+	"""
+	
+	if isinstance(filters, str):
+		filters = json.loads(filters) if filters else {}
+	
+	filters = filters or {}
+	normalized = frappe._dict()
+	
+	for key in allowed:
+		value = filters.get(key)
+		if not value:
+			continue
+		
+		if key.endswith("date"):
+			normalized[key] = str(getdate(value))
+		else:
+			normalized[key] = cstr(value).strip()
+	
+	return normalized
+
+
+def apply_default_date_range(filters, days=DEFAULT_RANGE_DAYS):
+	"""Fill a missing from_date / to_date with the window of `days` ending today
+	
+	Defaults are whole dates, so every default view opened on the same day
+	shares one cache entry.
+	"""
+	
+	to_date = filters.get("to_date") or today()
+	from_date = filters.get("from_date") or add_days(getdate(to_date), -days)
+	filters.update({"from_date": str(getdate(from_date)), "to_date": str(getdate(to_date))})
+	
+	return filters
+
+
+def generation_key(scope):
+	return frappe.cache().make_key(f"indeed:generation:{scope}")
+
+
+def get_generation(scope):
+	"""Current generation of a data scope; cached results of older generations are ignored"""
+	
+	return cint(frappe.cache().get(generation_key(scope)))
+
+
+def bump_generation(scope):
+	"""Invalidate every cached result computed from `scope`"""
+	
+	frappe.cache().incr(generation_key(scope))
+
+
+def invalidate_application_analytics(doc=None, method=None):
+	"""Job Applicant hook: new or changed applicants invalidate Application Analytics"""
+	
+	bump_generation("applications")
+
+
+def invalidate_job_selection(doc=None, method=None):
+	"""Job Opening hook: job changes invalidate cached Bulk Job Manager counts"""
+	
+	bump_generation("jobs")
+
+
+def invalidate_integration_dashboard(doc=None, method=None):
+	"""Indeed Job Integration hook: integration changes invalidate the Indeed Dashboard"""
+	
+	bump_generation("integrations")
+
+
+def make_cache_key(namespace, filters, generation=0):
+	"""Build a cache key for `namespace` that is stable for equal filter sets"""
+	
+	payload = json.dumps(filters or {}, sort_keys=True, default=str)
+	digest = hashlib.md5(payload.encode()).hexdigest()
+	return f"indeed:{namespace}:{generation}:{digest}"
+
+
+def get_cached_result(namespace, filters, compute, ttl=DEFAULT_TTL, scope=None):
+	"""Return the cached result for (namespace, filters), computing it on a miss
+	
+	With a `scope`, the key includes that scope's generation counter, so
+	bumping the generation invalidates all filter sets at once. Concurrent
+	misses for the same key wait for a single computation; a request that
+	gives up waiting computes its own result without caching it.
+	"""
+	
+	generation = get_generation(scope) if scope else 0
+	key = make_cache_key(namespace, filters, generation)
+	
+	result = frappe.cache().get_value(key)
+	if result is not None:
+		return result
+	
+	lock = frappe.cache().lock(
+		frappe.cache().make_key(f"{key}:lock"),
+		timeout=COMPUTE_LOCK_TTL,
+		blocking_timeout=COMPUTE_LOCK_TIMEOUT
+	)
+	acquired = lock.acquire()
+	
+	# Another worker may have filled the cache while we waited
+	result = frappe.cache().get_value(key)
+	if result is not None:
+		if acquired:
+			release_lock(lock)
+		return result
+	
+	if not acquired:
+		# The computing worker is still busy; don't race it for the cache entry
+		return compute()
+	
+	try:
+		result = compute()
+		frappe.cache().set_value(key, result, expires_in_sec=ttl)
+	finally:
+		release_lock(lock)
+	
+	return result
+
+
+def release_lock(lock):
+	"""Release a compute lock that may have expired while it was held"""
+	
+	try:
+		lock.release()
+	except LockError:
+		pass
@@ -1,9 +1,14 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import now_datetime, get_datetime, add_days, date_diff
+from frappe.utils import now_datetime, get_datetime, add_days, date_diff, cint
 import random
 import math
+import string
+from indeed.indeed.ab_statistics import evaluate_counts, get_campaign_counts, get_leading_variant
+from indeed.indeed.ab_routing import clear_campaign_routing_cache, get_campaign_url
+from indeed.indeed.ab_tracking import clear_variant_jobs_cache
+from indeed.indeed.ab_variants import create_variant_jobs
 
 
 class ABTestCampaign(Document):
@@ -16,6 +21,10 @@ class ABTestCampaign(Document):
 			if self.start_date >= self.end_date:
 				frappe.throw(_("End date must be after start date"))
 		
+		if self.allocation_mode == "Bandit":
+			self.validate_bandit_variants()
+			return
+		
 		if self.traffic_split < 10 or self.traffic_split > 90:
 			frappe.throw(_("Traffic split must be between 10% and 90%"))
 		
@@ -28,6 +37,20 @@ class ABTestCampaign(Document):
 			if self.variant_a_description == self.variant_b_description:
 				frappe.throw(_("Variant A and B descriptions must be different for testing"))
 	
+	def validate_bandit_variants(self):
+		"""Label bandit arms Variant A, Variant B, ... and check there are enough of them"""
+		
+		if len(self.bandit_variants) < 2:
+			frappe.throw(_("Bandit mode needs at least two variants"))
+		
+		if len(self.bandit_variants) > len(string.ascii_uppercase):
+			frappe.throw(_("Bandit mode supports at most {0} variants").format(len(string.ascii_uppercase)))
+		
+		for letter, row in zip(string.ascii_uppercase, self.bandit_variants):
+			if row.variant and row.variant != f"Variant {letter}" and row.job_opening:
+				frappe.throw(_("Variants of a started campaign cannot be reordered or removed"))
+			row.variant = f"Variant {letter}"
+	
 	def before_save(self):
 		"""Auto-populate variants from base job if not set"""
 		
@@ -50,6 +73,12 @@ class ABTestCampaign(Document):
 		
 		elif self.status == "Completed" and self.has_value_changed("status"):
 			self.calculate_results()
+		
+		# View tracking only counts jobs of active campaigns
+		if self.has_value_changed("status"):
+			clear_variant_jobs_cache()
+		
+		clear_campaign_routing_cache(self.name)
 	
 	def start_ab_test(self):
 		"""Start the A/B test by creating variant job postings"""
@@ -59,57 +88,112 @@ class ABTestCampaign(Document):
 		
 		base_job = frappe.get_doc("Job Opening", self.base_job_opening)
 		
-		# Create Variant A job (based on original)
-		variant_a = self.create_variant_job(base_job, "A", self.variant_a_title, self.variant_a_description)
+		if self.allocation_mode == "Bandit":
+			self.start_bandit_test(base_job)
+			return
+		
+		# Create both variant jobs; they are posted to Indeed together
+		variant_a, variant_b = self.create_variant_jobs(base_job, [
+			("Variant A", self.variant_a_title, self.variant_a_description),
+			("Variant B", self.variant_b_title, self.variant_b_description)
+		])
 		
-		# Create Variant B job
-		variant_b = self.create_variant_job(base_job, "B", self.variant_b_title, self.variant_b_description)
+		# Live results start from zero; see indeed.indeed.ab_statistics
+		for fieldname in ("variant_a_applications", "variant_a_views", "variant_b_applications", "variant_b_views"):
+			self.db_set(fieldname, 0)
 		
 		# Link variants to this test
 		self.db_set("variant_a_job", variant_a.name)
 		self.db_set("variant_b_job", variant_b.name)
+		self.db_set("campaign_url", get_campaign_url(self.name))
 		
 		frappe.msgprint(_("A/B Test started! Variant jobs created and posted to Indeed."))
 	
-	def create_variant_job(self, base_job, variant_letter, title, description):
-		"""Create a variant job posting"""
+	def start_bandit_test(self, base_job):
+		"""Create a variant job for every bandit arm without one and reset the arm counters"""
 		
-		variant_job = frappe.copy_doc(base_job)
+		new_rows = [row for row in self.bandit_variants if not row.job_opening]
+		variant_jobs = self.create_variant_jobs(base_job, [
+			(row.variant, row.job_title or base_job.job_title, row.description or base_job.description)
+			for row in new_rows
+		])
 		
-		# Update with variant content
-		variant_job.job_title = title
-		variant_job.description = description
-		variant_job.job_opening = None  # Clear to get new name
+		for row, variant_job in zip(new_rows, variant_jobs):
+			row.db_set("job_opening", variant_job.name)
 		
-		# Add AB test identifier
-		variant_job.custom_ab_test_campaign = self.name
-		variant_job.custom_ab_test_variant = f"Variant {variant_letter}"
+		for row in self.bandit_variants:
+			row.db_set("applications", 0)
+			row.db_set("views", 0)
 		
-		# Enable Indeed posting
-		variant_job.custom_post_to_indeed = 1
+		self.db_set("campaign_url", get_campaign_url(self.name))
+		
+		frappe.msgprint(_("Bandit test started! {0} variant jobs created and posted to Indeed.").format(len(self.bandit_variants)))
+	
+	def create_variant_jobs(self, base_job, variants):
+		"""Create the variant job postings of this campaign in one batch
 		
-		variant_job.insert()
+		`variants` is a list of (variant label, title, description) tuples.
+		"""
 		
-		return variant_job
+		return create_variant_jobs(
+			base_job,
+			[{"variant": variant, "title": title, "description": description} for variant, title, description in variants],
+			campaign=self.name
+		)
 	
 	def calculate_results(self):
 		"""Calculate test results and determine winner"""
 		
+		if self.allocation_mode == "Bandit":
+			self.calculate_bandit_results()
+			return
+		
 		# Get application data for both variants
 		variant_a_data = self.get_variant_metrics("variant_a_job")
 		variant_b_data = self.get_variant_metrics("variant_b_job")
 		
 		# Update metrics
 		self.variant_a_applications = variant_a_data["applications"]
-		self.variant_a_conversion = variant_a_data["conversion_rate"]
+		self.variant_a_views = variant_a_data["views"]
 		self.variant_b_applications = variant_b_data["applications"]
-		self.variant_b_conversion = variant_b_data["conversion_rate"]
+		self.variant_b_views = variant_b_data["views"]
 		
-		# Determine winner using statistical significance
-		self.determine_winner(variant_a_data, variant_b_data)
+		# Determine winner with a two-proportion test on the recounted totals
+		self.update(evaluate_counts(
+			variant_a_data["applications"], variant_a_data["views"],
+			variant_b_data["applications"], variant_b_data["views"],
+			final=True
+		))
 		
 		# Generate conclusions
 		self.generate_test_conclusion(variant_a_data, variant_b_data)
+		
+		# Runs from on_update, so the results are written directly
+		self.db_update()
+	
+	def calculate_bandit_results(self):
+		"""Recount every bandit arm and name the best-converting one"""
+		
+		counts = {}
+		for _campaign, variant, applications, views in get_campaign_counts([self.name]):
+			totals = counts.setdefault(variant, [0, 0])
+			totals[0] += cint(applications)
+			totals[1] += cint(views)
+		
+		arms = []
+		for row in self.bandit_variants:
+			row.applications, row.views = counts.get(row.variant, [0, 0])
+			row.db_update()
+			arms.append([row.variant, row.job_opening, row.applications, row.views])
+		
+		self.leading_variant = get_leading_variant(arms)
+		self.test_conclusion = "\n".join(
+			f"{variant}: {applications} applications from {views} views"
+			f" ({(applications / views * 100) if views else 0:.2f}% conversion)"
+			for variant, _job, applications, views in arms
+		) + f"\n\nBest converting variant: {self.leading_variant}"
+		
+		self.db_update()
 	
 	def get_variant_metrics(self, variant_field):
 		"""Get metrics for a specific variant"""
@@ -127,8 +211,12 @@ class ABTestCampaign(Document):
 			}
 		)
 		
-		# Get job views (if tracked) - placeholder for now
-		views = 100  # This would come from Indeed analytics API
+		# Views counted by indeed.indeed.ab_tracking
+		views = cint(frappe.db.sql("""
+			SELECT COALESCE(SUM(views), 0)
+			FROM `tabAB Test Variant Stats`
+			WHERE job_opening = %s AND day BETWEEN %s AND %s
+		""", [variant_job, self.start_date, self.end_date])[0][0])
 		
 		# Calculate conversion rate
 		conversion_rate = (applications / views * 100) if views > 0 else 0
@@ -139,52 +227,6 @@ class ABTestCampaign(Document):
 			"views": views
 		}
 	
-	def determine_winner(self, variant_a_data, variant_b_data):
-		"""Determine statistical winner using chi-square test"""
-		
-		# Simple statistical significance calculation
-		# In production, you'd use proper statistical tests
-		
-		a_apps = variant_a_data["applications"]
-		a_views = variant_a_data["views"]
-		b_apps = variant_b_data["applications"]
-		b_views = variant_b_data["views"]
-		
-		total_apps = a_apps + b_apps
-		total_views = a_views + b_views
-		
-		if total_apps == 0 or total_views == 0:
-			self.winner = "No Significant Difference"
-			self.confidence_level = 0
-			self.statistical_significance = 0
-			return
-		
-		# Calculate expected applications for each variant
-		expected_a = (a_views / total_views) * total_apps
-		expected_b = (b_views / total_views) * total_apps
-		
-		# Chi-square test (simplified)
-		if expected_a > 0 and expected_b > 0:
-			chi_square = ((a_apps - expected_a) ** 2 / expected_a) + ((b_apps - expected_b) ** 2 / expected_b)
-			
-			# Simplified confidence calculation
-			if chi_square > 3.84:  # 95% confidence threshold
-				self.statistical_significance = 1
-				self.confidence_level = 95
-				
-				if variant_a_data["conversion_rate"] > variant_b_data["conversion_rate"]:
-					self.winner = "Variant A"
-				else:
-					self.winner = "Variant B"
-			else:
-				self.winner = "No Significant Difference"
-				self.confidence_level = chi_square / 3.84 * 95  # Rough approximation
-				self.statistical_significance = 0
-		else:
-			self.winner = "No Significant Difference"
-			self.confidence_level = 0
-			self.statistical_significance = 0
-	
 	def generate_test_conclusion(self, variant_a_data, variant_b_data):
 		"""Generate detailed test conclusions and recommendations"""
 		
@@ -245,29 +287,33 @@ RECOMMENDATIONS:
 """
 		
 		self.test_conclusion = conclusion
-
+	
 	@frappe.whitelist()
 	def clone_winning_variant(self):
 		"""Clone the winning variant to create a new optimized job posting"""
 		
-		if not self.winner or self.winner == "No Significant Difference":
-			frappe.throw(_("Cannot clone - no clear winner determined"))
-		
-		winning_job_field = "variant_a_job" if self.winner == "Variant A" else "variant_b_job"
-		winning_job_name = self.get(winning_job_field)
+		if self.allocation_mode == "Bandit":
+			winning_job_name = next(
+				(row.job_opening for row in self.bandit_variants if row.variant == self.leading_variant), None
+			)
+		else:
+			if not self.winner or self.winner == "No Significant Difference":
+				frappe.throw(_("Cannot clone - no clear winner determined"))
+			
+			winning_job_field = "variant_a_job" if self.winner == "Variant A" else "variant_b_job"
+			winning_job_name = self.get(winning_job_field)
 		
 		if not winning_job_name:
 			frappe.throw(_("Winning variant job not found"))
 		
 		winning_job = frappe.get_doc("Job Opening", winning_job_name)
 		
-		# Create optimized job based on winner
-		optimized_job = frappe.copy_doc(winning_job)
-		optimized_job.job_title = f"{winning_job.job_title} (Optimized)"
-		optimized_job.custom_ab_test_campaign = None
-		optimized_job.custom_ab_test_variant = None
-		optimized_job.insert()
+		# Create optimized job based on winner, outside of the campaign
+		optimized_job, = create_variant_jobs(winning_job, [{
+			"title": f"{winning_job.job_title} (Optimized)",
+			"description": winning_job.description
+		}])
 		
-		frappe.msgprint(_(f"Optimized job created: {optimized_job.name}"))
+		frappe.msgprint(_("Optimized job created: {0}").format(optimized_job.name))
 		
 		return optimized_job.name
\ No newline at end of file
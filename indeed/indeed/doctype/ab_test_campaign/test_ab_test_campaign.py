@@ -0,0 +1,68 @@
+from frappe.tests.utils import FrappeTestCase
+
+from indeed.indeed.ab_routing import assign_variant
+from indeed.indeed.ab_statistics import evaluate_counts, probability_b_beats_a, two_proportion_test
+
+
+class TestABTestCampaign(FrappeTestCase):
+	def test_assign_variant_is_deterministic(self):
+		for visitor in ("visitor-1", "visitor-2", "visitor-3"):
+			self.assertEqual(
+				assign_variant("_Test Campaign", visitor, 50),
+				assign_variant("_Test Campaign", visitor, 50)
+			)
+	
+	def test_assign_variant_follows_traffic_split(self):
+		visitors = [f"visitor-{i}" for i in range(20000)]
+		
+		for split in (10, 30, 50, 90):
+			share_a = sum(
+				assign_variant("_Test Campaign", visitor, split) == "Variant A" for visitor in visitors
+			) / len(visitors)
+			self.assertAlmostEqual(share_a, split / 100, delta=0.02)
+	
+	def test_assign_variant_extremes(self):
+		self.assertEqual(assign_variant("_Test Campaign", "visitor", 0), "Variant B")
+		self.assertEqual(assign_variant("_Test Campaign", "visitor", 100), "Variant A")
+	
+	def test_evaluate_counts_without_views(self):
+		results = evaluate_counts(0, 0, 0, 0)
+		
+		self.assertEqual(results["variant_a_conversion"], 0)
+		self.assertEqual(results["variant_b_conversion"], 0)
+		self.assertEqual(results["p_value"], 1.0)
+		self.assertEqual(results["statistical_significance"], 0)
+		self.assertAlmostEqual(results["prob_b_beats_a"], 50.0)
+		self.assertEqual(results["early_stop_recommended"], 0)
+		self.assertEqual(results["winner"], "")
+		
+		self.assertEqual(evaluate_counts(0, 0, 0, 0, final=True)["winner"], "No Significant Difference")
+		
+		# Applications without views cannot be significant either
+		self.assertEqual(evaluate_counts(3, 0, 5, 100)["statistical_significance"], 0)
+	
+	def test_two_proportion_test(self):
+		z, p_value = two_proportion_test(100, 1000, 150, 1000)
+		self.assertAlmostEqual(z, 3.3806, places=3)
+		self.assertAlmostEqual(p_value, 0.000723, places=5)
+		
+		# No conversions on either side: no variance, no evidence
+		self.assertEqual(two_proportion_test(0, 500, 0, 500), (0.0, 1.0))
+		self.assertEqual(two_proportion_test(5, 0, 5, 10), (0.0, 1.0))
+	
+	def test_evaluate_counts_picks_significant_winner(self):
+		results = evaluate_counts(100, 1000, 150, 1000, final=True)
+		
+		self.assertEqual(results["winner"], "Variant B")
+		self.assertEqual(results["statistical_significance"], 1)
+		self.assertAlmostEqual(results["variant_b_conversion"], 15.0)
+		self.assertGreater(results["prob_b_beats_a"], 99)
+		self.assertEqual(results["early_stop_recommended"], 1)
+		
+		self.assertEqual(evaluate_counts(150, 1000, 100, 1000)["winner"], "Variant A")
+	
+	def test_probability_b_beats_a_is_symmetric(self):
+		self.assertAlmostEqual(probability_b_beats_a(10, 100, 10, 100), 0.5)
+		self.assertAlmostEqual(
+			probability_b_beats_a(10, 100, 20, 100) + probability_b_beats_a(20, 100, 10, 100), 1.0
+		)
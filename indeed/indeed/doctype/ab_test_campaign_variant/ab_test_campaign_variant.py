@@ -0,0 +1,7 @@
+from frappe.model.document import Document
+
+
+class ABTestCampaignVariant(Document):
+	"""Arm of a bandit AB Test Campaign; views and applications are kept by indeed.indeed.ab_statistics"""
+	
+	pass
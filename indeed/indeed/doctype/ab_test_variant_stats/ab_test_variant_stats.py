@@ -0,0 +1,17 @@
+import frappe
+from frappe.model.document import Document
+
+
+class ABTestVariantStats(Document):
+	"""Impressions and views of one AB test variant job on one day
+	
+	Rows are written by indeed.indeed.ab_tracking, never edited by hand.
+	"""
+	
+	pass
+
+
+def on_doctype_update():
+	"""Index for per-campaign range scans"""
+	
+	frappe.db.add_index("AB Test Variant Stats", ["campaign", "day"])
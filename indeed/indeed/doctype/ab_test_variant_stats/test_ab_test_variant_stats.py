@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import today
+
+from indeed.indeed import ab_tracking
+
+
+VARIANT_JOBS = {"_Test AB Variant Job": ["_Test AB Campaign", "Variant A"]}
+
+
+class TestABTestVariantStats(FrappeTestCase):
+	def setUp(self):
+		self.clear()
+	
+	def tearDown(self):
+		self.clear()
+	
+	def clear(self):
+		cache = frappe.cache()
+		for key in (ab_tracking.COUNTER_KEY, ab_tracking.FLUSHING_KEY):
+			cache.delete(cache.make_key(key))
+		
+		frappe.db.delete("AB Test Variant Stats", {"job_opening": "_Test AB Variant Job"})
+		frappe.db.commit()
+	
+	@patch.object(ab_tracking, "load_variant_jobs", return_value=VARIANT_JOBS)
+	@patch.object(ab_tracking, "get_variant_jobs", return_value=VARIANT_JOBS)
+	def test_recorded_events_are_flushed_to_stats(self, _get_variant_jobs, _load_variant_jobs):
+		for _i in range(3):
+			self.assertTrue(ab_tracking.record_event("_Test AB Variant Job", "view"))
+		ab_tracking.record_event("_Test AB Variant Job", "impression")
+		
+		# Jobs outside running campaigns are not counted
+		self.assertFalse(ab_tracking.record_event("_Test Other Job", "view"))
+		
+		ab_tracking.flush_counters()
+		
+		stats = frappe.db.get_value(
+			"AB Test Variant Stats",
+			ab_tracking.stats_row_name(today(), "_Test AB Variant Job"),
+			["campaign", "variant", "impressions", "views"],
+			as_dict=True
+		)
+		self.assertEqual(stats.campaign, "_Test AB Campaign")
+		self.assertEqual(stats.variant, "Variant A")
+		self.assertEqual(stats.impressions, 1)
+		self.assertEqual(stats.views, 3)
+		
+		# Both hashes are gone and a second flush adds nothing
+		cache = frappe.cache()
+		self.assertFalse(cache.exists(ab_tracking.COUNTER_KEY))
+		self.assertFalse(cache.exists(ab_tracking.FLUSHING_KEY))
+		
+		ab_tracking.flush_counters()
+		self.assertEqual(
+			frappe.db.get_value("AB Test Variant Stats", {"job_opening": "_Test AB Variant Job"}, "views"), 3
+		)
+	
+	@patch.object(ab_tracking, "load_variant_jobs", return_value=VARIANT_JOBS)
+	@patch.object(ab_tracking, "get_variant_jobs", return_value=VARIANT_JOBS)
+	def test_later_flushes_add_to_existing_rows(self, _get_variant_jobs, _load_variant_jobs):
+		ab_tracking.record_event("_Test AB Variant Job", "view")
+		ab_tracking.flush_counters()
+		
+		ab_tracking.record_event("_Test AB Variant Job", "view")
+		ab_tracking.flush_counters()
+		
+		self.assertEqual(
+			frappe.db.get_value("AB Test Variant Stats", {"job_opening": "_Test AB Variant Job"}, "views"), 2
+		)
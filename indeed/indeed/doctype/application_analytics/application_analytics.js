@@ -0,0 +1,161 @@
+// Copyright (c) 2025, sammish and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Application Analytics", {
+	setup() {
+		frappe.require("/assets/indeed/css/indeed_dashboards.css");
+	},
+
+	refresh(frm) {
+		frm.add_custom_button(__("Refresh Data"), () => frm.trigger("load_analytics"));
+		frm.trigger("load_analytics");
+	},
+
+	from_date: (frm) => frm.trigger("load_analytics"),
+	to_date: (frm) => frm.trigger("load_analytics"),
+	company_filter: (frm) => frm.trigger("load_analytics"),
+	job_filter: (frm) => frm.trigger("load_analytics"),
+	source_filter: (frm) => frm.trigger("load_analytics"),
+
+	load_analytics(frm) {
+		const wrapper = frm.get_field("analytics_html").$wrapper;
+		wrapper.html(`<p class="text-muted">${__("Loading analytics...")}</p>`);
+
+		frappe.call({
+			method: "indeed.indeed.doctype.application_analytics.application_analytics.get_analytics_data",
+			args: {
+				filters: {
+					from_date: frm.doc.from_date,
+					to_date: frm.doc.to_date,
+					company_filter: frm.doc.company_filter,
+					job_filter: frm.doc.job_filter,
+					source_filter: frm.doc.source_filter,
+				},
+			},
+			callback(r) {
+				if (!r.message) {
+					return;
+				}
+				const data = r.message;
+				const values = Object.assign({}, data.metrics, get_text_fields(data));
+				Object.assign(frm.doc, values);
+				Object.keys(values).forEach((field) => frm.refresh_field(field));
+				wrapper.html(render_analytics(data));
+				render_trend_chart(wrapper.find(".indeed-trend-chart")[0], data.weekly_trend);
+			},
+		});
+	},
+});
+
+function get_text_fields(data) {
+	const pct = (part, total) => (total > 0 ? (part / total) * 100 : 0).toFixed(1);
+	const trend = data.weekly_trend;
+
+	return {
+		source_breakdown: data.sources
+			.map((row) => `${row.source}: ${row.applications} applications (${row.percentage.toFixed(1)}%)`)
+			.join("\n"),
+		top_job_performance: data.top_jobs
+			.map(
+				(job) =>
+					`${job.job_title}: ${job.total_applications} total apps ` +
+					`(${job.indeed_applications} from Indeed - ${pct(job.indeed_applications, job.total_applications)}%)`
+			)
+			.join("\n"),
+		trend_analysis: trend.timestamps.length
+			? trend.timestamps
+					.map(
+						(week, i) =>
+							`Week of ${week}: ${trend.totals[i]} total ` +
+							`(${trend.indeed[i]} Indeed - ${pct(trend.indeed[i], trend.totals[i])}%)`
+					)
+					.join("\n")
+			: __("No trend data available for selected period."),
+		recommendations: data.recommendations.join("\n"),
+	};
+}
+
+function render_analytics(data) {
+	const metrics = data.metrics;
+	const escape = frappe.utils.escape_html;
+	const card = (value, label) => `
+		<div class="indeed-metric-card">
+			<div class="indeed-metric-value">${value}</div>
+			<div class="indeed-metric-label">${label}</div>
+		</div>`;
+
+	const sources = data.sources.length
+		? data.sources
+				.map(
+					(row) =>
+						`<div class="indeed-source-bar">${escape(row.source)}: ${row.applications} (${row.percentage.toFixed(1)}%)</div>`
+				)
+				.join("")
+		: `<p>${__("No source data available.")}</p>`;
+
+	const top_jobs = data.top_jobs.length
+		? `<table class="table table-condensed">
+				<thead>
+					<tr>
+						<th>${__("Job")}</th>
+						<th>${__("Applications")}</th>
+						<th>${__("From Indeed")}</th>
+					</tr>
+				</thead>
+				<tbody>${data.top_jobs
+					.map(
+						(job) => `<tr>
+							<td><a href="/app/job-opening/${encodeURIComponent(job.job_id)}">${escape(job.job_title || job.job_id)}</a></td>
+							<td>${job.total_applications}</td>
+							<td>${job.indeed_applications}</td>
+						</tr>`
+					)
+					.join("")}</tbody>
+			</table>`
+		: `<p>${__("No job performance data available.")}</p>`;
+
+	return `
+		<h3>${__("Application Analytics Dashboard")}</h3>
+		<div class="indeed-metric-grid">
+			${card(metrics.total_applications, __("Total Applications"))}
+			${card(metrics.indeed_applications, __("Indeed Applications"))}
+			${card(`${flt(metrics.conversion_rate, 1)}%`, __("Indeed Conversion Rate"))}
+			${card(flt(metrics.avg_time_to_apply, 1), __("Avg Days to Apply"))}
+			${card(flt(metrics.median_time_to_apply, 1), __("Median Days to Apply"))}
+			${card(flt(metrics.p90_time_to_apply, 1), __("P90 Days to Apply"))}
+		</div>
+		<div class="indeed-panel">
+			<h4>${__("Weekly Applications")}</h4>
+			<div class="indeed-trend-chart"></div>
+		</div>
+		<div class="indeed-panel">
+			<h4>${__("Application Source Distribution")}</h4>
+			<div class="indeed-source-chart">${sources}</div>
+		</div>
+		<div class="indeed-panel">
+			<h4>${__("Top Performing Jobs")}</h4>
+			${top_jobs}
+		</div>
+		<div class="indeed-panel indeed-recommendations">
+			<h4>${__("Actionable Recommendations")}</h4>
+			${data.recommendations.map((text) => `<p>${escape(text)}</p>`).join("")}
+		</div>`;
+}
+
+function render_trend_chart(element, trend) {
+	if (!element || !trend.timestamps.length) {
+		return;
+	}
+
+	new frappe.Chart(element, {
+		type: "line",
+		height: 240,
+		data: {
+			labels: trend.timestamps.map((day) => frappe.datetime.str_to_user(day)),
+			datasets: [
+				{ name: __("All Applications"), values: trend.totals },
+				{ name: __("Indeed"), values: trend.indeed },
+			],
+		},
+	});
+}
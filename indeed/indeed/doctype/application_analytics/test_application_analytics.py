@@ -0,0 +1,74 @@
+from datetime import date
+from unittest import skipIf
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from indeed.indeed import analytics_queries
+from indeed.indeed.analytics_engine import GroupAccumulator, histogram_percentile, np
+
+
+class TestApplicationAnalytics(FrappeTestCase):
+	def get_series(self, from_date, to_date, bucket, buckets):
+		with patch.object(analytics_queries, "get_application_buckets", return_value=buckets):
+			return analytics_queries.get_application_series({"from_date": from_date, "to_date": to_date}, bucket)
+	
+	def test_monthly_series_is_gap_filled_across_month_boundaries(self):
+		series = self.get_series("2024-01-31", "2024-03-10", "month", {date(2024, 2, 1): (5, 2)})
+		
+		self.assertEqual(series["timestamps"], ["2024-01-01", "2024-02-01", "2024-03-01"])
+		self.assertEqual(series["totals"], [0, 5, 0])
+		self.assertEqual(series["indeed"], [0, 2, 0])
+	
+	def test_weekly_series_starts_on_monday(self):
+		series = self.get_series("2024-01-31", "2024-02-12", "week", {date(2024, 2, 5): (3, 1)})
+		
+		self.assertEqual(series["timestamps"], ["2024-01-29", "2024-02-05", "2024-02-12"])
+		self.assertEqual(series["totals"], [0, 3, 0])
+	
+	def test_daily_series_crosses_leap_day(self):
+		series = self.get_series("2024-02-28", "2024-03-01", "day", {date(2024, 2, 29): (1, 1)})
+		
+		self.assertEqual(series["timestamps"], ["2024-02-28", "2024-02-29", "2024-03-01"])
+		self.assertEqual(series["totals"], [0, 1, 0])
+	
+	def test_invalid_bucket_is_rejected(self):
+		with self.assertRaises(frappe.ValidationError):
+			self.get_series("2024-01-01", "2024-01-31", "year", {})
+	
+	@skipIf(np is None, "NumPy is not installed")
+	def test_histogram_percentile_matches_numpy(self):
+		counts = np.array([0, 4, 1, 0, 7, 2, 0, 0, 1])
+		values = np.repeat(np.arange(len(counts)), counts)
+		
+		for q in (0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1):
+			self.assertAlmostEqual(histogram_percentile(counts, q), float(np.percentile(values, q * 100)))
+	
+	@skipIf(np is None, "NumPy is not installed")
+	def test_histogram_percentile_of_empty_histogram(self):
+		self.assertEqual(histogram_percentile(np.zeros(5, dtype=np.int64), 0.5), 0.0)
+		self.assertEqual(histogram_percentile(np.zeros(0, dtype=np.int64), 0.5), 0.0)
+	
+	@skipIf(np is None, "NumPy is not installed")
+	def test_group_accumulator_merges_chunks(self):
+		accumulator = GroupAccumulator()
+		accumulator.add(
+			np.array(["LinkedIn", "Website", "LinkedIn"], dtype=object),
+			np.array([True, False, False]),
+			np.array([2, 5, 4]),
+			np.array([True, True, False])
+		)
+		accumulator.add(
+			np.array(["Indeed", "LinkedIn"], dtype=object),
+			np.array([True, True]),
+			np.array([1, 3]),
+			np.array([True, True])
+		)
+		
+		self.assertEqual(accumulator.to_list("source"), [
+			{"source": "LinkedIn", "total_applications": 3, "indeed_applications": 2, "indeed_share": 66.7, "avg_time_to_apply": 2.5},
+			{"source": "Website", "total_applications": 1, "indeed_applications": 0, "indeed_share": 0.0, "avg_time_to_apply": 5.0},
+			{"source": "Indeed", "total_applications": 1, "indeed_applications": 1, "indeed_share": 100.0, "avg_time_to_apply": 1.0}
+		])
+		self.assertEqual([row["source"] for row in accumulator.to_list("source", limit=1)], ["LinkedIn"])
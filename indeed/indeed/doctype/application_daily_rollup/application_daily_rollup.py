@@ -0,0 +1,18 @@
+import frappe
+from frappe.model.document import Document
+
+
+class ApplicationDailyRollup(Document):
+	"""Daily application counts per (day, company, job opening, source)
+	
+	Rows are written by indeed.indeed.analytics_rollup, never edited by hand.
+	"""
+	
+	pass
+
+
+def on_doctype_update():
+	"""Indexes for the analytics panels' range scans"""
+	
+	frappe.db.add_index("Application Daily Rollup", ["day", "company"])
+	frappe.db.add_index("Application Daily Rollup", ["job_opening", "day"])
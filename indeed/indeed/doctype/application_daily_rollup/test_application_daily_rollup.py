@@ -0,0 +1,23 @@
+from frappe.tests.utils import FrappeTestCase
+
+from indeed.indeed.analytics_rollup import weighted_percentile
+
+
+class TestApplicationDailyRollup(FrappeTestCase):
+	def test_weighted_percentile_interpolates_between_values(self):
+		histogram = [(1, 1), (2, 1), (3, 1), (4, 1)]
+		
+		self.assertEqual(weighted_percentile(histogram, 0.5), 2.5)
+		self.assertEqual(weighted_percentile(histogram, 0), 1)
+		self.assertEqual(weighted_percentile(histogram, 1), 4)
+		self.assertAlmostEqual(weighted_percentile(histogram, 0.75), 3.25)
+	
+	def test_weighted_percentile_expands_counts(self):
+		# Same as PERCENTILE_CONT over [0, 0, 0, 10]
+		self.assertAlmostEqual(weighted_percentile([(0, 3), (10, 1)], 0.9), 7.0)
+		self.assertEqual(weighted_percentile([(0, 3), (10, 1)], 0.5), 0)
+	
+	def test_weighted_percentile_ignores_empty_bins(self):
+		self.assertEqual(weighted_percentile([], 0.5), 0)
+		self.assertEqual(weighted_percentile([(5, 0), (7, 0)], 0.5), 0)
+		self.assertEqual(weighted_percentile([(5, 0), (7, 2)], 0.5), 7)
@@ -0,0 +1,167 @@
+// Copyright (c) 2025, sammish and contributors
+// For license information, please see license.txt
+
+const BULK_JOB_FILTER_FIELDS = ["company_filter", "department_filter", "job_status_filter", "from_date", "to_date"];
+
+frappe.ui.form.on("Bulk Job Manager", {
+	setup(frm) {
+		frm.bulk_jobs = { rows: [], selected: new Set(), next_cursor: null, total: 0 };
+
+		frappe.realtime.on("indeed_bulk_operation_complete", (data) => {
+			frappe.show_alert({ message: data.summary, indicator: data.success ? "green" : "red" });
+			frm.reload_doc();
+		});
+	},
+
+	refresh(frm) {
+		frm.trigger("load_jobs");
+	},
+
+	company_filter: (frm) => frm.trigger("load_jobs"),
+	department_filter: (frm) => frm.trigger("load_jobs"),
+	job_status_filter: (frm) => frm.trigger("load_jobs"),
+	from_date: (frm) => frm.trigger("load_jobs"),
+	to_date: (frm) => frm.trigger("load_jobs"),
+
+	select_all(frm) {
+		render_job_selection(frm);
+	},
+
+	load_jobs(frm) {
+		frm.bulk_jobs = { rows: [], selected: new Set(), next_cursor: null, total: 0 };
+		fetch_job_page(frm);
+	},
+
+	execute_button(frm) {
+		const select_all = frm.doc.select_all ? 1 : 0;
+		const job_names = Array.from(frm.bulk_jobs.selected);
+
+		if (!select_all && !job_names.length) {
+			frappe.msgprint(__("Please select at least one job to perform bulk operation."));
+			return;
+		}
+
+		frappe.call({
+			method: "indeed.indeed.bulk_operations.execute_bulk_operation",
+			args: {
+				job_names: select_all ? null : job_names,
+				operation: frm.doc.bulk_action,
+				new_status: frm.doc.new_status,
+				indeed_action: frm.doc.indeed_action,
+				select_all: select_all,
+				filters: select_all ? get_selection_filters(frm) : null,
+			},
+			freeze: true,
+			callback(r) {
+				if (r.message) {
+					frm.set_value("operation_results", r.message.results);
+					frappe.show_alert({
+						message: r.message.summary,
+						indicator: r.message.success ? "green" : "red",
+					});
+					if (!r.message.queued) {
+						frm.trigger("load_jobs");
+					}
+				}
+			},
+		});
+	},
+});
+
+function get_selection_filters(frm) {
+	const filters = {};
+	BULK_JOB_FILTER_FIELDS.forEach((field) => {
+		if (frm.doc[field]) {
+			filters[field] = frm.doc[field];
+		}
+	});
+	return filters;
+}
+
+function fetch_job_page(frm) {
+	const state = frm.bulk_jobs;
+
+	frappe.call({
+		method: "indeed.indeed.doctype.bulk_job_manager.bulk_job_manager.get_matching_jobs",
+		args: {
+			filters: get_selection_filters(frm),
+			after: state.next_cursor,
+			with_count: state.rows.length ? 0 : 1,
+		},
+		callback(r) {
+			if (!r.message || frm.bulk_jobs !== state) {
+				return;
+			}
+			state.rows = state.rows.concat(r.message.jobs);
+			state.next_cursor = r.message.next_cursor;
+			if (r.message.total !== null) {
+				state.total = r.message.total;
+			}
+			render_job_selection(frm);
+		},
+	});
+}
+
+function render_job_selection(frm) {
+	const state = frm.bulk_jobs;
+	const wrapper = frm.get_field("selected_jobs_html").$wrapper;
+	const select_all = !!frm.doc.select_all;
+
+	if (!state.rows.length) {
+		wrapper.html(`<p>${__("No jobs found matching the criteria.")}</p>`);
+		return;
+	}
+
+	const rows = state.rows
+		.map((job) => {
+			const name = frappe.utils.escape_html(job.name);
+			const checked = select_all || state.selected.has(job.name) ? "checked" : "";
+			const indeed_class = job.custom_post_to_indeed ? "indicator-pill green" : "indicator-pill red";
+			return `<tr>
+				<td><input type="checkbox" class="job-checkbox" data-name="${name}" ${checked} ${select_all ? "disabled" : ""}></td>
+				<td><a href="/app/job-opening/${encodeURIComponent(job.name)}" target="_blank">${frappe.utils.escape_html(job.job_title || job.name)}</a></td>
+				<td>${frappe.utils.escape_html(job.company || "")}</td>
+				<td>${frappe.utils.escape_html(job.department || "")}</td>
+				<td>${frappe.utils.escape_html(job.status || "")}</td>
+				<td><span class="${indeed_class}">${job.custom_post_to_indeed ? __("Enabled") : __("Disabled")}</span></td>
+				<td>${job.creation ? frappe.datetime.str_to_user(job.creation.split(" ")[0]) : ""}</td>
+			</tr>`;
+		})
+		.join("");
+
+	const selected_count = select_all ? state.total : state.selected.size;
+
+	wrapper.html(`
+		<div class="bulk-job-manager">
+			<p><strong>${__("Found {0} jobs matching criteria", [state.total])}</strong>
+				<span class="selected-count text-muted" style="margin-left: 10px;">${__("{0} jobs selected", [selected_count])}</span></p>
+			<table class="table table-bordered table-condensed">
+				<thead>
+					<tr>
+						<th>${__("Select")}</th>
+						<th>${__("Job Title")}</th>
+						<th>${__("Company")}</th>
+						<th>${__("Department")}</th>
+						<th>${__("Status")}</th>
+						<th>${__("Indeed Status")}</th>
+						<th>${__("Created")}</th>
+					</tr>
+				</thead>
+				<tbody>${rows}</tbody>
+			</table>
+			${state.next_cursor ? `<button class="btn btn-default btn-sm load-more-jobs">${__("Load More")}</button>` : ""}
+		</div>
+	`);
+
+	wrapper.find(".job-checkbox").on("change", function () {
+		const name = $(this).attr("data-name");
+		if (this.checked) {
+			state.selected.add(name);
+		} else {
+			state.selected.delete(name);
+		}
+		wrapper.find(".selected-count").text(__("{0} jobs selected", [state.selected.size]));
+	});
+
+	wrapper.find(".load-more-jobs").on("click", () => fetch_job_page(frm));
+}
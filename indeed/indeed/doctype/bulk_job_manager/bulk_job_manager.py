@@ -1,205 +1,166 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import now_datetime, get_datetime, add_days
+from frappe.utils import cint, get_datetime
+import base64
 import json
+from indeed.indeed.cache import get_cached_result, normalize_filters
+
+
+# Columns returned for each job in the selection grid
+JOB_FIELDS = [
+	"name", "job_title", "company", "department", "status",
+	"creation", "custom_post_to_indeed"
+]
+
+SELECTION_FILTER_FIELDS = ["company_filter", "department_filter", "job_status_filter", "from_date", "to_date"]
+
+DEFAULT_PAGE_LENGTH = 50
+MAX_PAGE_LENGTH = 500
 
 
 class BulkJobManager(Document):
-	"""Bulk Job Management Tool for Indeed Integration"""
+	"""Bulk Job Management Tool for Indeed Integration
 	
-	def onload(self):
-		"""Load matching jobs when document opens"""
-		self.load_matching_jobs()
+	The form fetches matching jobs page by page from `get_matching_jobs`.
+	"Select All Matching Jobs" is sent to the server as the filter set itself
+	rather than as a list of job names.
+	"""
 	
-	def load_matching_jobs(self):
-		"""Load jobs matching the selection criteria"""
-		
-		# Build filters based on user selection
-		filters = {}
-		
-		if self.company_filter:
-			filters["company"] = self.company_filter
-		
-		if self.department_filter:
-			filters["department"] = self.department_filter
-		
-		if self.job_status_filter:
-			filters["status"] = self.job_status_filter
-			
-		if self.from_date and self.to_date:
-			filters["creation"] = ["between", [self.from_date, self.to_date]]
-		elif self.from_date:
-			filters["creation"] = [">=", self.from_date]
-		elif self.to_date:
-			filters["creation"] = ["<=", self.to_date]
-		
-		# Get matching job openings
-		jobs = frappe.get_all(
-			"Job Opening",
-			filters=filters,
-			fields=[
-				"name", "job_title", "company", "department", "status", 
-				"creation", "custom_post_to_indeed"
-			],
-			limit=100  # Limit for performance
-		)
-		
-		# Generate HTML table for job selection
-		self.selected_jobs_html = self.generate_job_selection_html(jobs)
+	pass
+
+
+def parse_selection_filters(filters):
+	"""Normalise selection filters passed from the client"""
 	
-	def generate_job_selection_html(self, jobs):
-		"""Generate HTML for job selection interface"""
-		
-		if not jobs:
-			return "<p>No jobs found matching the criteria.</p>"
-		
-		html = f"""
-		<div class="bulk-job-manager">
-			<style>
-				.job-table {{
-					width: 100%;
-					border-collapse: collapse;
-					margin: 10px 0;
-				}}
-				.job-table th, .job-table td {{
-					border: 1px solid #ddd;
-					padding: 8px;
-					text-align: left;
-				}}
-				.job-table th {{
-					background-color: #f2f2f2;
-				}}
-				.job-checkbox {{
-					margin-right: 5px;
-				}}
-				.indeed-status {{
-					padding: 2px 6px;
-					border-radius: 3px;
-					font-size: 11px;
-				}}
-				.indeed-enabled {{ background: #d4edda; color: #155724; }}
-				.indeed-disabled {{ background: #f8d7da; color: #721c24; }}
-			</style>
-			
-			<p><strong>Found {len(jobs)} jobs matching criteria</strong></p>
-			
-			<table class="job-table">
-				<thead>
-					<tr>
-						<th><input type="checkbox" id="select-all-jobs" onchange="toggleAllJobs()"> Select</th>
-						<th>Job Title</th>
-						<th>Company</th>
-						<th>Department</th>
-						<th>Status</th>
-						<th>Indeed Status</th>
-						<th>Created</th>
-					</tr>
-				</thead>
-				<tbody>
-		"""
-		
-		for job in jobs:
-			indeed_status = "Enabled" if job.custom_post_to_indeed else "Disabled"
-			indeed_class = "indeed-enabled" if job.custom_post_to_indeed else "indeed-disabled"
-			
-			html += f"""
-				<tr>
-					<td>
-						<input type="checkbox" class="job-checkbox" 
-							   value="{job.name}" name="selected_job">
-					</td>
-					<td><a href="/app/job-opening/{job.name}" target="_blank">{job.job_title}</a></td>
-					<td>{job.company or ''}</td>
-					<td>{job.department or ''}</td>
-					<td>{job.status}</td>
-					<td><span class="indeed-status {indeed_class}">{indeed_status}</span></td>
-					<td>{job.creation.strftime('%Y-%m-%d') if job.creation else ''}</td>
-				</tr>
-			"""
+	return normalize_filters(filters, SELECTION_FILTER_FIELDS)
+
+
+def build_job_conditions(filters):
+	"""Build SQL conditions and parameters for the job selection criteria"""
+	
+	filters = parse_selection_filters(filters)
+	conditions = []
+	params = []
+	
+	if filters.company_filter:
+		conditions.append("company = %s")
+		params.append(filters.company_filter)
+	
+	if filters.department_filter:
+		conditions.append("department = %s")
+		params.append(filters.department_filter)
+	
+	if filters.job_status_filter:
+		conditions.append("status = %s")
+		params.append(filters.job_status_filter)
+	
+	if filters.from_date:
+		conditions.append("creation >= %s")
+		params.append(get_datetime(filters.from_date))
+	
+	if filters.to_date:
+		# Dates are inclusive of the whole day
+		conditions.append("creation < DATE_ADD(%s, INTERVAL 1 DAY)")
+		params.append(filters.to_date)
+	
+	return conditions, params
+
+
+def encode_cursor(row):
+	"""Encode the (creation, name) position of a row as an opaque token"""
+	
+	payload = json.dumps([str(row.creation), row.name])
+	return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+	"""Decode a token produced by `encode_cursor`"""
+	
+	try:
+		creation, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+	except Exception:
+		frappe.throw(_("Invalid pagination cursor"))
+	
+	return get_datetime(creation), name
+
+
+def fetch_job_page(filters, after=None, page_length=DEFAULT_PAGE_LENGTH, fields=None):
+	"""Fetch one page of matching jobs ordered by (creation, name) descending
+	
+	Uses keyset pagination: `after` is the cursor of the last row of the
+	previous page, so every page is an index range scan regardless of depth.
+	"""
+	
+	conditions, params = build_job_conditions(filters)
+	
+	if after:
+		creation, name = decode_cursor(after)
+		conditions.append("creation <= %s AND (creation < %s OR name < %s)")
+		params.extend([creation, creation, name])
+	
+	where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+	columns = ", ".join(f"`{field}`" for field in (fields or JOB_FIELDS))
+	
+	return frappe.db.sql(f"""
+		SELECT {columns}
+		FROM `tabJob Opening`
+		{where}
+		ORDER BY creation DESC, name DESC
+		LIMIT %s
+	""", params + [page_length], as_dict=True)
+
+
+def count_matching_jobs(filters):
+	"""Count jobs matching the selection criteria"""
+	
+	conditions, params = build_job_conditions(filters)
+	where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+	
+	return frappe.db.sql(f"""
+		SELECT COUNT(*)
+		FROM `tabJob Opening`
+		{where}
+	""", params)[0][0]
+
+
+def iter_matching_job_batches(filters, batch_size=MAX_PAGE_LENGTH):
+	"""Yield lists of matching job names, one keyset page at a time"""
+	
+	after = None
+	
+	while True:
+		rows = fetch_job_page(filters, after, batch_size, fields=["name", "creation"])
+		if not rows:
+			return
 		
-		html += """
-				</tbody>
-			</table>
-			
-			<div style="margin-top: 20px;">
-				<button class="btn btn-primary" onclick="executeSelectedOperation()">
-					Execute Operation on Selected Jobs
-				</button>
-				<span id="selected-count" style="margin-left: 10px; color: #666;">
-					0 jobs selected
-				</span>
-			</div>
-		</div>
+		yield [row.name for row in rows]
 		
-		<script>
-			function toggleAllJobs() {
-				var selectAll = document.getElementById('select-all-jobs');
-				var checkboxes = document.getElementsByClassName('job-checkbox');
-				
-				for (var i = 0; i < checkboxes.length; i++) {
-					checkboxes[i].checked = selectAll.checked;
-				}
-				updateSelectedCount();
-			}
-			
-			function updateSelectedCount() {
-				var checkboxes = document.getElementsByClassName('job-checkbox');
-				var selectedCount = 0;
-				
-				for (var i = 0; i < checkboxes.length; i++) {
-					if (checkboxes[i].checked) {
-						selectedCount++;
-					}
-				}
-				
-				document.getElementById('selected-count').textContent = selectedCount + ' jobs selected';
-			}
-			
-			// Add event listeners to individual checkboxes
-			document.addEventListener('change', function(e) {
-				if (e.target.classList.contains('job-checkbox')) {
-					updateSelectedCount();
-				}
-			});
-			
-			function executeSelectedOperation() {
-				var selectedJobs = [];
-				var checkboxes = document.getElementsByClassName('job-checkbox');
-				
-				for (var i = 0; i < checkboxes.length; i++) {
-					if (checkboxes[i].checked) {
-						selectedJobs.push(checkboxes[i].value);
-					}
-				}
-				
-				if (selectedJobs.length === 0) {
-					frappe.msgprint('Please select at least one job to perform bulk operation.');
-					return;
-				}
-				
-				// Call server method to execute bulk operation
-				frappe.call({
-					method: 'indeed.indeed.bulk_operations.execute_bulk_operation',
-					args: {
-						job_names: selectedJobs,
-						operation: cur_frm.doc.bulk_action,
-						new_status: cur_frm.doc.new_status,
-						indeed_action: cur_frm.doc.indeed_action
-					},
-					callback: function(r) {
-						if (r.message) {
-							cur_frm.set_value('operation_results', r.message.results);
-							cur_frm.refresh_field('operation_results');
-							frappe.show_alert({
-								message: r.message.summary,
-								indicator: r.message.success ? 'green' : 'red'
-							});
-						}
-					}
-				});
-			}
-		</script>
-		"""
+		if len(rows) < batch_size:
+			return
 		
-		return html
\ No newline at end of file
+		after = encode_cursor(rows[-1])
+
+
+@frappe.whitelist()
+def get_matching_jobs(filters=None, after=None, page_length=DEFAULT_PAGE_LENGTH, with_count=1):
+	"""Return a page of jobs matching the Bulk Job Manager selection criteria
+	
+	Pass the returned `next_cursor` back as `after` to fetch the next page.
+	"""
+	
+	frappe.has_permission("Job Opening", "read", throw=True)
+	
+	filters = parse_selection_filters(filters)
+	page_length = min(max(cint(page_length), 1), MAX_PAGE_LENGTH)
+	jobs = fetch_job_page(filters, after, page_length)
+	
+	total = None
+	if cint(with_count):
+		total = get_cached_result("bulk_job_count", filters, lambda: count_matching_jobs(filters), ttl=60, scope="jobs")
+	
+	return {
+		"jobs": jobs,
+		"next_cursor": encode_cursor(jobs[-1]) if len(jobs) == page_length else None,
+		"total": total
+	}
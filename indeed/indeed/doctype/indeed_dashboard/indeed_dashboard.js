@@ -0,0 +1,133 @@
+// Copyright (c) 2025, sammish and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Indeed Dashboard", {
+	setup() {
+		frappe.require("/assets/indeed/css/indeed_dashboards.css");
+
+		frappe.realtime.on("indeed_export_complete", (data) => {
+			if (data.success) {
+				frappe.msgprint({
+					title: __("Export Ready"),
+					message: `<a href="${data.file_url}" target="_blank">${__("Download {0}", [data.subject])}</a>`,
+					indicator: "green",
+				});
+			} else {
+				frappe.show_alert({ message: __("{0} failed, see Error Log", [data.subject]), indicator: "red" });
+			}
+		});
+	},
+
+	refresh(frm) {
+		frm.add_custom_button(__("Regenerate XML Feed"), () => {
+			frappe.call({
+				method: "indeed.indeed.utils.regenerate_xml_feed",
+				callback(r) {
+					if (r.message && r.message.success) {
+						frappe.show_alert({ message: __("XML Feed regenerated successfully!"), indicator: "green" });
+					}
+				},
+			});
+		}, __("Actions"));
+
+		frm.add_custom_button(__("View Failed Jobs"), () => {
+			frappe.set_route("List", "Indeed Job Integration", { status: "Failed" });
+		}, __("Actions"));
+
+		frm.add_custom_button(__("Download Report"), () => {
+			frappe.call({
+				method: "indeed.indeed.bulk_operations.export_integration_report",
+				args: { from_date: frm.doc.from_date, to_date: frm.doc.to_date },
+				callback(r) {
+					if (r.message) {
+						frappe.show_alert({ message: r.message.message, indicator: "blue" });
+					}
+				},
+			});
+		}, __("Actions"));
+
+		frm.trigger("load_dashboard");
+	},
+
+	from_date: (frm) => frm.trigger("load_dashboard"),
+	to_date: (frm) => frm.trigger("load_dashboard"),
+	company_filter: (frm) => frm.trigger("load_dashboard"),
+	status_filter: (frm) => frm.trigger("load_dashboard"),
+
+	load_dashboard(frm) {
+		const wrapper = frm.get_field("sync_status_html").$wrapper;
+		wrapper.html(`<p class="text-muted">${__("Loading dashboard...")}</p>`);
+
+		frappe.call({
+			method: "indeed.indeed.doctype.indeed_dashboard.indeed_dashboard.get_dashboard_data",
+			args: {
+				filters: {
+					from_date: frm.doc.from_date,
+					to_date: frm.doc.to_date,
+					company_filter: frm.doc.company_filter,
+					status_filter: frm.doc.status_filter,
+				},
+			},
+			callback(r) {
+				if (!r.message) {
+					return;
+				}
+				Object.assign(frm.doc, r.message.metrics);
+				Object.keys(r.message.metrics).forEach((field) => frm.refresh_field(field));
+				wrapper.html(render_dashboard(r.message));
+			},
+		});
+	},
+});
+
+function render_dashboard(data) {
+	const metrics = data.metrics;
+	const card = (value, label, css_class = "") => `
+		<div class="indeed-metric-card">
+			<div class="indeed-metric-value ${css_class}">${value}</div>
+			<div class="indeed-metric-label">${label}</div>
+		</div>`;
+
+	return `
+		<h3>${__("Indeed Integration Health Overview")}</h3>
+		<div class="indeed-metric-grid">
+			${card(metrics.successful_posts, __("Successful Posts"), "success")}
+			${card(metrics.failed_posts, __("Failed Posts"), "failed")}
+			${card(metrics.pending_jobs, __("Pending Jobs"), "pending")}
+			${card(`${flt(metrics.success_rate, 1)}%`, __("Success Rate"))}
+		</div>
+		<div class="indeed-panel">
+			<h4>${__("Recent Integration Activity")}</h4>
+			${render_activity(data.activity)}
+		</div>`;
+}
+
+function render_activity(activity) {
+	if (!activity.length) {
+		return `<p>${__("No recent activity found.")}</p>`;
+	}
+
+	const rows = activity
+		.map(
+			(day) => `<tr>
+				<td>${frappe.datetime.str_to_user(day.date)}</td>
+				<td>${day.posted}</td>
+				<td>${day.failed}</td>
+				<td>${day.pending}</td>
+			</tr>`
+		)
+		.join("");
+
+	return `
+		<table class="table table-striped">
+			<thead>
+				<tr>
+					<th>${__("Date")}</th>
+					<th>${__("Posted")}</th>
+					<th>${__("Failed")}</th>
+					<th>${__("Pending")}</th>
+				</tr>
+			</thead>
+			<tbody>${rows}</tbody>
+		</table>`;
+}
@@ -1,6 +1,7 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.utils import now_datetime
 
 
 class IndeedIntegrationSettings(Document):
@@ -21,4 +22,12 @@ class IndeedIntegrationSettings(Document):
 	def on_update(self):
 		"""Clear cache when settings are updated"""
 		frappe.cache().delete_key("indeed_integration_settings")
-	
+		
+		# The company URL is part of every payload; rebuild them on the next feed or sync.
+		# Bumping `modified` puts every integration past the sync watermark again.
+		if self.has_value_changed("company_url"):
+			frappe.db.sql("""
+				UPDATE `tabIndeed Job Integration`
+				SET source_modified = NULL, modified = %(now)s
+			""", {"now": now_datetime()})
+
@@ -38,4 +38,10 @@ class IndeedJobIntegration(Document):
 	def on_update(self):
 		"""Update job opening with indeed job id if available"""
 		if self.indeed_job_id and self.job_opening:
-			frappe.db.set_value("Job Opening", self.job_opening, "custom_indeed_job_id", self.indeed_job_id)
\ No newline at end of file
+			frappe.db.set_value("Job Opening", self.job_opening, "custom_indeed_job_id", self.indeed_job_id)
+
+
+def on_doctype_update():
+	"""Index for incremental change exports ordered by (modified, name)"""
+	
+	frappe.db.add_index("Indeed Job Integration", ["modified", "name"])
@@ -0,0 +1,58 @@
+from datetime import date
+import hashlib
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from indeed.indeed import exports
+from indeed.indeed.utils import get_payload_hash
+
+
+JOB_DATA = {
+	"title": "Backend Engineer",
+	"description": "<p>Build things</p>",
+	"location": "Kochi, Kerala, India",
+	"salary_min": 50000.0,
+	"salary_max": 80000.0,
+	"external_id": "HR-OPN-2024-0001",
+	"posting_date": date(2024, 1, 15)
+}
+
+
+class TestIndeedJobIntegration(FrappeTestCase):
+	def test_payload_hash_ignores_key_order(self):
+		reordered = dict(reversed(list(JOB_DATA.items())))
+		
+		self.assertEqual(get_payload_hash(reordered), get_payload_hash(JOB_DATA))
+		self.assertRegex(get_payload_hash(JOB_DATA), r"^[0-9a-f]{64}$")
+	
+	def test_payload_hash_changes_with_content(self):
+		changed = {**JOB_DATA, "salary_max": 85000.0}
+		
+		self.assertNotEqual(get_payload_hash(changed), get_payload_hash(JOB_DATA))
+		self.assertNotEqual(get_payload_hash({**JOB_DATA, "location": None}), get_payload_hash(JOB_DATA))
+	
+	def test_payload_hash_is_stable_across_releases(self):
+		# Stored hashes must keep matching; a changed canonical form would resend every job
+		self.assertEqual(
+			get_payload_hash({"b": 1, "a": [1, 2], "c": date(2024, 1, 15)}),
+			"045484e61eb367ec6e592cd910d6bd523edd9d45198eea1bf1943d448cb30b52"
+		)
+	
+	@patch.object(exports, "notify_export_ready")
+	@patch("frappe.core.doctype.file.file.File.get_content")
+	def test_export_file_is_registered_without_reading_it(self, get_content, notify_export_ready):
+		exports.run_export(
+			"Test export", "_test_export", "SELECT name FROM `tabUser` ORDER BY name LIMIT 3", {},
+			[("name", "string")], "csv", 1, "Administrator"
+		)
+		
+		get_content.assert_not_called()
+		file_doc = notify_export_ready.call_args.args[2]
+		self.addCleanup(frappe.delete_doc, "File", file_doc.name, ignore_permissions=True)
+		
+		# The hash taken while writing is the File doctype's hash of the finished file
+		with open(file_doc.get_full_path(), "rb") as export_file:
+			self.assertEqual(file_doc.content_hash, hashlib.md5(export_file.read()).hexdigest())
+		self.assertEqual(frappe.db.get_value("File", file_doc.name, "content_hash"), file_doc.content_hash)
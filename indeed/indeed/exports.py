@@ -0,0 +1,449 @@
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cint, get_datetime, now_datetime
+from indeed.indeed.analytics_queries import iter_query_chunks
+from indeed.indeed.cache import apply_default_date_range
+import base64
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+
+try:
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+except ImportError:
+	pa = pq = None
+
+
+# Seconds a background export may run
+EXPORT_TIMEOUT = 7200
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Typed columns of each exportable dataset, in query order
+INTEGRATION_REPORT_COLUMNS = [
+	("job_id", "string"), ("job_title", "string"), ("company", "string"), ("department", "string"),
+	("job_status", "string"), ("job_created", "timestamp"), ("indeed_status", "string"),
+	("indeed_posted", "timestamp"), ("posted_date", "timestamp"), ("error_message", "string"),
+	("applications", "int"), ("indeed_applications", "int")
+]
+
+APPLICANT_COLUMNS = [
+	("applicant_id", "string"), ("job_opening", "string"), ("company", "string"), ("source", "string"),
+	("status", "string"), ("applied_on", "timestamp"), ("job_created", "timestamp"), ("modified", "timestamp")
+]
+
+# Rows returned by one incremental change request, at most
+MAX_CHANGE_BATCH = 5000
+
+# Changes younger than this are left for the next request, so rows of
+# transactions still in flight cannot be skipped by an advancing watermark
+CHANGE_SETTLE_SECONDS = 60
+
+# Tables exposed through `export_changes`, with their columns and row filter
+CHANGE_DATASETS = {
+	"integrations": frappe._dict(
+		doctype="Indeed Job Integration",
+		fields=[
+			"name", "job_opening", "indeed_job_id", "status", "integration_method", "posted_date",
+			"job_title", "company", "location", "employment_type", "salary_range", "currency",
+			"job_url", "application_url", "xml_feed_included", "error_message", "last_sync_date",
+			"creation", "modified"
+		],
+		condition=None
+	),
+	"applicants": frappe._dict(
+		doctype="Job Applicant",
+		fields=["name", "job_title", "source", "status", "creation", "modified"],
+		condition="source = 'Indeed'"
+	)
+}
+
+ROLLUP_COLUMNS = [
+	("day", "date"), ("company", "string"), ("job_opening", "string"), ("source", "string"),
+	("job_created_on", "date"), ("applications", "int")
+]
+
+
+def get_export_filename(prefix, extension):
+	"""Return a unique, timestamped file name for an export"""
+	
+	timestamp = now_datetime().strftime("%Y%m%d_%H%M%S")
+	return f"{prefix}_{timestamp}_{frappe.generate_hash(length=6)}.{extension}"
+
+
+def require_pyarrow():
+	if pa is None:
+		frappe.throw(_("Parquet exports require PyArrow. Install it with `bench pip install pyarrow`."))
+
+
+def get_arrow_schema(columns):
+	"""Build a PyArrow schema from (name, type) column definitions"""
+	
+	arrow_types = {
+		"string": pa.string(),
+		"int": pa.int64(),
+		"date": pa.date32(),
+		"timestamp": pa.timestamp("us")
+	}
+	
+	return pa.schema([(name, arrow_types[column_type]) for name, column_type in columns])
+
+
+class HashingWriter(io.RawIOBase):
+	"""Binary file opened for writing that keeps an MD5 digest of the bytes written
+	
+	The digest matches the File doctype's content hash, so the export can be
+	registered without reading the finished file back.
+	"""
+	
+	def __init__(self, path):
+		self.file = open(path, "wb")
+		self.digest = hashlib.md5(usedforsecurity=False)
+	
+	def writable(self):
+		return True
+	
+	def write(self, data):
+		self.digest.update(data)
+		return self.file.write(data)
+	
+	def tell(self):
+		return self.file.tell()
+	
+	def close(self):
+		if not self.closed:
+			self.file.close()
+		super().close()
+	
+	@property
+	def content_hash(self):
+		return self.digest.hexdigest()
+
+
+def write_parquet(output, columns, chunks):
+	"""Write row chunks as Parquet to the binary file `output`, one row group per chunk
+	
+	Returns the number of rows written.
+	"""
+	
+	schema = get_arrow_schema(columns)
+	record_count = 0
+	
+	with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+		for chunk in chunks:
+			arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+			writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+			record_count += len(chunk)
+	
+	return record_count
+
+
+def write_csv(output, columns, chunks, compress=False):
+	"""Write a header and row chunks to the binary file `output`, gzip-compressed if `compress`
+	
+	Rows are written as they arrive, so only one chunk is held in memory.
+	Returns the number of rows written.
+	"""
+	
+	if compress:
+		csvfile = gzip.open(output, "wt", newline="", encoding="utf-8")
+	else:
+		csvfile = io.TextIOWrapper(output, newline="", encoding="utf-8")
+	
+	record_count = 0
+	
+	with csvfile:
+		writer = csv.writer(csvfile)
+		writer.writerow([name for name, _column_type in columns])
+		
+		for chunk in chunks:
+			writer.writerows(chunk)
+			record_count += len(chunk)
+	
+	return record_count
+
+
+def attach_export_file(filename, content_hash):
+	"""Register a file written to the site's private files folder as a File document
+	
+	`File.insert` reads the whole file to hash it and look for duplicates.
+	Exports are unique and hashed while written, so the row is inserted
+	directly instead.
+	"""
+	
+	path = frappe.get_site_path("private", "files", filename)
+	
+	file_doc = frappe.get_doc({
+		"doctype": "File",
+		"file_name": filename,
+		"file_url": f"/private/files/{filename}",
+		"is_private": 1,
+		"file_size": os.path.getsize(path),
+		"content_hash": content_hash,
+		"owner": frappe.session.user
+	})
+	file_doc.set_folder_name()
+	file_doc.set_file_type()
+	file_doc.db_insert()
+	
+	return file_doc
+
+
+def notify_export_ready(user, subject, file_doc, record_count):
+	"""Tell `user` that an export finished, both live and in their notifications"""
+	
+	frappe.get_doc({
+		"doctype": "Notification Log",
+		"for_user": user,
+		"type": "Alert",
+		"subject": _("{0} is ready ({1} records)").format(subject, record_count),
+		"document_type": "File",
+		"document_name": file_doc.name
+	}).insert(ignore_permissions=True)
+	
+	frappe.publish_realtime(
+		"indeed_export_complete",
+		{"success": True, "subject": subject, "file_url": file_doc.file_url, "record_count": record_count},
+		user=user
+	)
+
+
+def notify_export_failed(user, subject):
+	frappe.publish_realtime("indeed_export_complete", {"success": False, "subject": subject}, user=user)
+
+
+def run_export(subject, prefix, query, params, columns, file_format, compress, user):
+	"""Stream `query` into a private CSV or Parquet file and notify `user` when it is done"""
+	
+	if file_format == "parquet":
+		extension = "parquet"
+	else:
+		extension = "csv.gz" if compress else "csv"
+	
+	filename = get_export_filename(prefix, extension)
+	path = frappe.get_site_path("private", "files", filename)
+	
+	try:
+		chunks = iter_query_chunks(query, params)
+		with HashingWriter(path) as output:
+			if file_format == "parquet":
+				record_count = write_parquet(output, columns, chunks)
+			else:
+				record_count = write_csv(output, columns, chunks, compress)
+		
+		file_doc = attach_export_file(filename, output.content_hash)
+		notify_export_ready(user, subject, file_doc, record_count)
+		frappe.db.commit()
+	except Exception:
+		if os.path.exists(path):
+			os.remove(path)
+		frappe.log_error(f"{subject} export failed: {frappe.get_traceback()}", "Indeed Integration")
+		notify_export_failed(user, subject)
+
+
+def get_integration_report_query(from_date, to_date):
+	"""Return (query, params) for the integration report, one row per integration
+	
+	Applicant counts are aggregated per job opening from the daily rollup
+	before the join, so a job with several integration rows repeats its
+	counts on each row instead of multiplying applicants by integrations.
+	"""
+	
+	query = """
+		SELECT
+			jo.name as job_id,
+			jo.job_title,
+			jo.company,
+			jo.department,
+			jo.status as job_status,
+			jo.creation as job_created,
+			iji.status as indeed_status,
+			iji.creation as indeed_posted,
+			iji.posted_date,
+			iji.error_message,
+			CAST(COALESCE(apps.applications, 0) AS SIGNED) as applications,
+			CAST(COALESCE(apps.indeed_applications, 0) AS SIGNED) as indeed_applications
+		FROM `tabJob Opening` jo
+		LEFT JOIN `tabIndeed Job Integration` iji ON iji.job_opening = jo.name
+		LEFT JOIN (
+			SELECT
+				r.job_opening,
+				SUM(r.applications) AS applications,
+				SUM(CASE WHEN r.source = 'Indeed' THEN r.applications ELSE 0 END) AS indeed_applications
+			FROM `tabApplication Daily Rollup` r
+			WHERE r.job_created_on BETWEEN %(from_date)s AND %(to_date)s
+			GROUP BY r.job_opening
+		) apps ON apps.job_opening = jo.name
+		WHERE jo.creation >= %(from_date)s AND jo.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+		ORDER BY jo.creation DESC
+	"""
+	
+	return query, {"from_date": from_date, "to_date": to_date}
+
+
+def get_applicant_export_query(from_date, to_date):
+	"""Return (query, params) for applicants created in the window, without personal details"""
+	
+	query = """
+		SELECT
+			ja.name as applicant_id,
+			ja.job_title as job_opening,
+			jo.company,
+			ja.source,
+			ja.status,
+			ja.creation as applied_on,
+			jo.creation as job_created,
+			ja.modified
+		FROM `tabJob Applicant` ja
+		LEFT JOIN `tabJob Opening` jo ON jo.name = ja.job_title
+		WHERE ja.creation >= %(from_date)s AND ja.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+		ORDER BY ja.creation
+	"""
+	
+	return query, {"from_date": from_date, "to_date": to_date}
+
+
+def get_rollup_export_query(from_date, to_date):
+	"""Return (query, params) for daily application rollup rows in the window"""
+	
+	query = """
+		SELECT day, company, job_opening, source, job_created_on, applications
+		FROM `tabApplication Daily Rollup`
+		WHERE day BETWEEN %(from_date)s AND %(to_date)s
+		ORDER BY day
+	"""
+	
+	return query, {"from_date": from_date, "to_date": to_date}
+
+
+EXPORT_DATASETS = {
+	"integrations": frappe._dict(
+		subject="Indeed integration report", prefix="indeed_integration_report",
+		columns=INTEGRATION_REPORT_COLUMNS, get_query=get_integration_report_query
+	),
+	"applicants": frappe._dict(
+		subject="Job applicant export", prefix="indeed_applicants",
+		columns=APPLICANT_COLUMNS, get_query=get_applicant_export_query
+	),
+	"rollups": frappe._dict(
+		subject="Application rollup export", prefix="indeed_application_rollup",
+		columns=ROLLUP_COLUMNS, get_query=get_rollup_export_query
+	)
+}
+
+
+@frappe.whitelist()
+def export_dataset(dataset="integrations", from_date=None, to_date=None, file_format="csv", compress=0):
+	"""Queue an export of integrations, applicants or rollups as CSV or Parquet"""
+	
+	if dataset not in EXPORT_DATASETS:
+		frappe.throw(_("Unknown export dataset {0}").format(dataset))
+	
+	frappe.has_permission("Indeed Job Integration" if dataset == "integrations" else "Job Applicant", "read", throw=True)
+	
+	return enqueue_export(dataset, from_date, to_date, file_format, compress)
+
+
+def enqueue_export(dataset, from_date=None, to_date=None, file_format="csv", compress=0):
+	"""Queue an export of `dataset` for the current user"""
+	
+	if file_format not in EXPORT_FORMATS:
+		frappe.throw(_("Unsupported export format {0}").format(file_format))
+	
+	if file_format == "parquet":
+		require_pyarrow()
+	
+	filters = apply_default_date_range(frappe._dict(from_date=from_date, to_date=to_date))
+	
+	frappe.enqueue(
+		"indeed.indeed.exports.build_export",
+		queue="long",
+		timeout=EXPORT_TIMEOUT,
+		dataset=dataset,
+		from_date=filters.from_date,
+		to_date=filters.to_date,
+		file_format=file_format,
+		compress=cint(compress),
+		user=frappe.session.user
+	)
+	
+	return {
+		"success": True,
+		"queued": True,
+		"message": _("{0} is being generated. You will be notified when it is ready.").format(
+			_(EXPORT_DATASETS[dataset].subject)
+		)
+	}
+
+
+def build_export(dataset, from_date, to_date, file_format, compress, user):
+	"""Background job writing an export of `dataset` to a private file"""
+	
+	spec = EXPORT_DATASETS[dataset]
+	query, params = spec.get_query(from_date, to_date)
+	
+	run_export(_(spec.subject), spec.prefix, query, params, spec.columns, file_format, compress, user)
+
+
+def encode_change_token(modified, name):
+	"""Encode a (modified, name) position as an opaque resume token"""
+	
+	payload = json.dumps([str(modified), name])
+	return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_change_token(token):
+	"""Decode a token produced by `encode_change_token`"""
+	
+	try:
+		modified, name = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+	except Exception:
+		frappe.throw(_("Invalid change token"))
+	
+	return get_datetime(modified), name
+
+
+@frappe.whitelist()
+def export_changes(dataset="integrations", token=None, limit=1000):
+	"""Return rows of `dataset` changed after `token`, oldest first
+	
+	Rows are ordered by (modified, name) and the returned `next_token` marks
+	the last row sent; pass it back to resume. Without a token the export
+	starts from the beginning. Deleted rows are not reported.
+	"""
+	
+	if dataset not in CHANGE_DATASETS:
+		frappe.throw(_("Unknown change dataset {0}").format(dataset))
+	
+	spec = CHANGE_DATASETS[dataset]
+	frappe.has_permission(spec.doctype, "read", throw=True)
+	
+	limit = min(max(cint(limit), 1), MAX_CHANGE_BATCH)
+	conditions = ["modified < %(settled_before)s"]
+	params = {"settled_before": add_to_date(now_datetime(), seconds=-CHANGE_SETTLE_SECONDS), "limit": limit}
+	
+	if spec.condition:
+		conditions.append(spec.condition)
+	
+	if token:
+		params["modified"], params["name"] = decode_change_token(token)
+		conditions.append("modified >= %(modified)s AND (modified > %(modified)s OR name > %(name)s)")
+	
+	columns = ", ".join(f"`{field}`" for field in spec.fields)
+	rows = frappe.db.sql(f"""
+		SELECT {columns}
+		FROM `tab{spec.doctype}`
+		WHERE {' AND '.join(conditions)}
+		ORDER BY modified, name
+		LIMIT %(limit)s
+	""", params, as_dict=True)
+	
+	return {
+		"rows": rows,
+		"next_token": encode_change_token(rows[-1].modified, rows[-1].name) if rows else token,
+		"has_more": len(rows) == limit
+	}
@@ -0,0 +1,215 @@
+import frappe
+from frappe.utils import add_to_date, cint, now_datetime
+from indeed.indeed.cache import bump_generation
+from indeed.indeed.utils import (
+	PUBLISHED_STATUSES,
+	expire_via_indeed_api,
+	get_integration_settings,
+	get_payload_hash,
+	post_jobs_to_indeed,
+	prepare_job_data,
+	remove_jobs_from_xml_feed,
+	run_indeed_api_calls
+)
+
+
+# Global default holding the `modified` high-water mark of the last sync
+WATERMARK_KEY = "indeed_job_sync_watermark"
+
+# The watermark trails the sync start by this much, so rows of transactions
+# still in flight are picked up again on the next run instead of skipped
+WATERMARK_SETTLE_SECONDS = 60
+
+# Integrations diffed and sent to Indeed per batch
+SYNC_BATCH_SIZE = 200
+
+
+def get_live_integrations(watermark=None, job_openings=None):
+	"""Return integrations live on Indeed with the state of their Job Opening
+	
+	With a `watermark`, only integrations whose Job Opening or own record
+	changed since then are returned; `job_openings` limits the result to
+	those jobs.
+	"""
+	
+	conditions = ["i.status IN %(statuses)s"]
+	params = {"statuses": PUBLISHED_STATUSES}
+	
+	if watermark:
+		conditions.append("(jo.name IS NULL OR jo.modified >= %(watermark)s OR i.modified >= %(watermark)s)")
+		params["watermark"] = watermark
+	
+	if job_openings is not None:
+		conditions.append("i.job_opening IN %(job_openings)s")
+		params["job_openings"] = tuple(job_openings) or ("",)
+	
+	return frappe.db.sql(f"""
+		SELECT i.name, i.job_opening, i.integration_method, i.indeed_job_id,
+			i.payload_hash, i.source_modified,
+			jo.name AS job_exists, jo.status AS job_status,
+			jo.custom_post_to_indeed, jo.modified AS job_modified
+		FROM `tabIndeed Job Integration` i
+		LEFT JOIN `tabJob Opening` jo ON jo.name = i.job_opening
+		WHERE {' AND '.join(conditions)}
+		ORDER BY i.name
+	""", params, as_dict=True)
+
+
+def plan_sync(integrations, settings):
+	"""Diff live integrations against the current state of their Job Openings
+	
+	Returns (to_expire, to_update, unchanged): integrations whose job should
+	no longer be on Indeed, Job Openings whose payload differs from the one
+	last published, and integrations whose Job Opening changed without
+	changing the payload.
+	"""
+	
+	to_expire = []
+	to_update = []
+	unchanged = []
+	
+	for integration in integrations:
+		if (
+			not integration.job_exists
+			or integration.job_status == "Closed"
+			or not cint(integration.custom_post_to_indeed)
+		):
+			to_expire.append(integration)
+			continue
+		
+		# The stored payload was built from this exact version of the job
+		if integration.source_modified == integration.job_modified:
+			continue
+		
+		job_opening = frappe.get_doc("Job Opening", integration.job_opening)
+		if get_payload_hash(prepare_job_data(job_opening, settings)) == integration.payload_hash:
+			unchanged.append(integration)
+		else:
+			to_update.append(job_opening)
+	
+	return to_expire, to_update, unchanged
+
+
+def expire_integrations(integrations, settings):
+	"""Take jobs off Indeed: batched expire calls for API jobs, one feed rewrite for the rest
+	
+	Returns {integration name: error} for the integrations that could not be expired.
+	"""
+	
+	if not integrations:
+		return {}
+	
+	api_jobs = [i for i in integrations if i.integration_method == "API" and i.indeed_job_id]
+	outcomes = run_indeed_api_calls(
+		lambda job_id: expire_via_indeed_api(job_id, settings),
+		[(i.indeed_job_id,) for i in api_jobs],
+		settings
+	)
+	errors = {
+		integration.name: outcome.get("error", "Unknown error")
+		for integration, outcome in zip(api_jobs, outcomes)
+		if not outcome.get("success")
+	}
+	
+	# The feed lists every live job whatever its integration method
+	remove_jobs_from_xml_feed({i.job_opening for i in integrations if i.name not in errors})
+	
+	now = now_datetime()
+	updates = {}
+	for integration in integrations:
+		if integration.name in errors:
+			updates[integration.name] = {"error_message": errors[integration.name], "last_sync_date": now}
+		else:
+			updates[integration.name] = {
+				"status": "Expired",
+				"xml_feed_included": 0,
+				"error_message": None,
+				"last_sync_date": now
+			}
+	
+	frappe.db.bulk_update("Indeed Job Integration", updates)
+	bump_generation("integrations")
+	
+	return errors
+
+
+def sync_job_openings(job_openings=None, watermark=None):
+	"""Bring Indeed in line with local job state and return a summary of what was sent
+	
+	Live integrations are diffed in batches; jobs that were closed, deleted
+	or taken off Indeed are expired, jobs whose payload hash changed are
+	sent as updates and everything else is left alone.
+	"""
+	
+	settings = get_integration_settings()
+	integrations = get_live_integrations(watermark, job_openings)
+	summary = {"checked": len(integrations), "expired": 0, "updated": 0, "unchanged": 0, "failed": 0}
+	
+	for start in range(0, len(integrations), SYNC_BATCH_SIZE):
+		batch = integrations[start:start + SYNC_BATCH_SIZE]
+		to_expire, to_update, unchanged = plan_sync(batch, settings)
+		
+		failed = len(expire_integrations(to_expire, settings))
+		summary["expired"] += len(to_expire) - failed
+		summary["failed"] += failed
+		
+		if to_update:
+			responses = post_jobs_to_indeed(to_update)
+			succeeded = sum(1 for response in responses.values() if response.get("success"))
+			summary["updated"] += succeeded
+			summary["failed"] += len(to_update) - succeeded
+		
+		# Payload unchanged: remember the job version so feeds and later syncs skip it
+		now = now_datetime()
+		updated_jobs = {job.name for job in to_update}
+		expired = {i.name for i in to_expire}
+		unchanged_names = {i.name for i in unchanged}
+		
+		stamps = {}
+		for integration in batch:
+			if integration.name in expired or integration.job_opening in updated_jobs:
+				continue
+			stamps[integration.name] = {"last_sync_date": now}
+			if integration.name in unchanged_names:
+				stamps[integration.name]["source_modified"] = integration.job_modified
+		
+		frappe.db.bulk_update("Indeed Job Integration", stamps, update_modified=False)
+		summary["unchanged"] += len(unchanged)
+		
+		frappe.db.commit()
+	
+	return summary
+
+
+def expire_job_openings(job_openings):
+	"""Take the given Job Openings off Indeed now instead of at the next sync
+	
+	Returns {"expired": count, "failed": count, "errors": {job opening: error}}.
+	"""
+	
+	integrations = get_live_integrations(job_openings=job_openings)
+	errors = expire_integrations(integrations, get_integration_settings())
+	
+	return {
+		"expired": len(integrations) - len(errors),
+		"failed": len(errors),
+		"errors": {i.job_opening: errors[i.name] for i in integrations if i.name in errors}
+	}
+
+
+def sync_indeed_jobs():
+	"""Scheduled incremental sync of jobs changed since the last run
+	
+	Runs overlap by WATERMARK_SETTLE_SECONDS; re-syncing a job is a no-op
+	when nothing about it changed.
+	"""
+	
+	watermark = frappe.db.get_global(WATERMARK_KEY)
+	started_at = add_to_date(now_datetime(), seconds=-WATERMARK_SETTLE_SECONDS)
+	
+	summary = sync_job_openings(watermark=watermark)
+	
+	frappe.db.set_global(WATERMARK_KEY, str(started_at))
+	frappe.db.commit()
+	
+	return summary
@@ -1,15 +1,30 @@
 import frappe
 import requests
 from frappe import _
-from frappe.utils import now_datetime, get_url, cstr
+from frappe.utils import now_datetime, get_url, cstr, cint, flt
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from indeed.indeed.cache import release_lock
 import json
 import os
+import threading
+import time
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import hashlib
 import hmac
 
 
+# Integration statuses of jobs currently live on Indeed
+PUBLISHED_STATUSES = ("Posted", "Active")
+
+# Seconds a worker waits for another worker rewriting the XML feed
+FEED_LOCK_TIMEOUT = 60
+
+# Seconds the feed lock is held at most; longer than a full feed regeneration
+FEED_LOCK_TTL = 600
+
+
 def get_integration_settings():
 	"""Get Indeed integration settings"""
 	settings = frappe.cache().get_value("indeed_integration_settings")
@@ -26,8 +41,24 @@ def on_job_opening_save(doc, method):
 	if frappe.flags.in_import or frappe.flags.in_patch:
 		return
 	
-	# Check if the custom field exists and is enabled
-	if not doc.get("custom_post_to_indeed"):
+	# Skip if the caller posts this job itself (e.g. bulk operations)
+	if doc.flags.skip_indeed_posting:
+		return
+	
+	# Inserts run after_insert and then on_update; post only once
+	if method == "on_update" and doc.flags.in_insert:
+		return
+	
+	# Closed jobs and jobs taken off Indeed are expired by the sync engine
+	if doc.status == "Closed" or not doc.get("custom_post_to_indeed"):
+		if frappe.db.exists("Indeed Job Integration", {"job_opening": doc.name, "status": ["in", PUBLISHED_STATUSES]}):
+			frappe.enqueue(
+				"indeed.indeed.sync.expire_job_openings",
+				queue="default",
+				timeout=300,
+				job_openings=[doc.name],
+				enqueue_after_commit=True
+			)
 		return
 	
 	# Post to Indeed
@@ -43,60 +74,210 @@ def on_job_opening_save(doc, method):
 def post_job_to_indeed(job_opening):
 	"""Post job opening to Indeed via configured method"""
 	
+	responses = post_jobs_to_indeed([job_opening])
+	return responses.get(job_opening.name, {}).get("success", False)
+
+
+def post_jobs_to_indeed(job_openings):
+	"""Post a batch of job openings to Indeed via configured method
+	
+	Integration records are created up front, the remote calls are fanned out
+	over a bounded, rate limited thread pool and the outcomes are written back
+	serially. Jobs already live on Indeed are skipped when their payload hash
+	is unchanged and sent as updates when it differs. Returns a dict of job
+	opening name -> response.
+	"""
+	
 	settings = get_integration_settings()
 	
 	if not settings.enable_auto_posting:
 		frappe.log_error("Indeed auto-posting is disabled", "Indeed Integration")
-		return False
+		return {
+			job_opening.name: {"success": False, "error": "Indeed auto-posting is disabled"}
+			for job_opening in job_openings
+		}
 	
-	try:
-		# Check if already posted
-		existing = frappe.db.exists("Indeed Job Integration", {"job_opening": job_opening.name})
-		if existing:
-			frappe.log_error(f"Job {job_opening.name} already posted to Indeed", "Indeed Integration")
-			return False
-		
-		# Create Indeed Job Integration record
-		indeed_job = frappe.new_doc("Indeed Job Integration")
-		indeed_job.job_opening = job_opening.name
-		indeed_job.integration_method = settings.integration_method
-		indeed_job.status = "Draft"
-		indeed_job.insert()
-		
-		# Prepare job data
-		job_data = prepare_job_data(job_opening, settings)
+	responses = {}
+	pending = []
+	
+	for job_opening in job_openings:
+		try:
+			# Prepare job data
+			job_data = prepare_job_data(job_opening, settings)
+			
+			existing = frappe.db.get_value(
+				"Indeed Job Integration",
+				{"job_opening": job_opening.name},
+				["name", "status", "payload_hash"],
+				as_dict=True
+			)
+			
+			# Nothing to send if Indeed already has this exact payload
+			if existing and existing.status in PUBLISHED_STATUSES and existing.payload_hash == get_payload_hash(job_data):
+				responses[job_opening.name] = {"success": True, "unchanged": True}
+				continue
+			
+			if existing:
+				indeed_job = frappe.get_doc("Indeed Job Integration", existing.name)
+			else:
+				# Create Indeed Job Integration record
+				indeed_job = frappe.new_doc("Indeed Job Integration")
+				indeed_job.job_opening = job_opening.name
+				indeed_job.integration_method = settings.integration_method
+				indeed_job.status = "Draft"
+				indeed_job.insert()
+			
+			pending.append((job_opening, indeed_job, job_data))
 		
+		except Exception as e:
+			frappe.log_error(f"Indeed posting failed: {str(e)}", "Indeed Integration")
+			responses[job_opening.name] = {"success": False, "error": str(e)}
+	
+	if not pending:
+		return responses
+	
+	try:
 		# Post based on integration method
 		if settings.integration_method == "API":
-			response = post_via_indeed_api(job_data, settings, indeed_job)
+			outcomes = post_batch_via_indeed_api(
+				[job_data for _job, _integration, job_data in pending],
+				settings,
+				[get_published_job_id(indeed_job) for _job, indeed_job, _job_data in pending]
+			)
 		elif settings.integration_method == "XML_FEED":
-			response = add_to_xml_feed(job_data, indeed_job)
+			outcomes = add_jobs_to_xml_feed([job_data for _job, _integration, job_data in pending])
 		elif settings.integration_method == "THIRD_PARTY":
-			response = post_via_third_party(job_data, settings, indeed_job)
+			outcomes = [
+				post_via_third_party(job_data, settings, indeed_job)
+				for _job, indeed_job, job_data in pending
+			]
 		else:
-			response = {"success": False, "error": "Invalid integration method"}
-		
-		# Update Indeed Job Integration record
-		if response.get("success"):
-			indeed_job.status = "Posted"
-			indeed_job.posted_date = now_datetime()
-			indeed_job.indeed_job_id = response.get("job_id")
-			indeed_job.job_url = response.get("job_url")
-			if settings.integration_method == "XML_FEED":
-				indeed_job.xml_feed_included = 1
-		else:
-			indeed_job.status = "Error"
-			indeed_job.error_message = response.get("error", "Unknown error")
+			outcomes = [{"success": False, "error": "Invalid integration method"} for _item in pending]
 		
-		indeed_job.last_sync_date = now_datetime()
-		indeed_job.save()
-		frappe.db.commit()
-		
-		return response.get("success", False)
+		# Update Indeed Job Integration records
+		for (job_opening, indeed_job, job_data), response in zip(pending, outcomes):
+			update_integration_from_response(indeed_job, response, settings, job_data, job_opening.modified)
+			responses[job_opening.name] = response
 		
+		frappe.db.commit()
+	
 	except Exception as e:
 		frappe.log_error(f"Indeed posting failed: {str(e)}", "Indeed Integration")
-		return False
+		for job_opening, _integration, _job_data in pending:
+			responses.setdefault(job_opening.name, {"success": False, "error": str(e)})
+	
+	return responses
+
+
+def get_published_job_id(indeed_job):
+	"""Indeed job id to update instead of creating a new job, if the job is live"""
+	
+	return indeed_job.indeed_job_id if indeed_job.status in PUBLISHED_STATUSES else None
+
+
+def get_payload_hash(job_data):
+	"""SHA-256 of the canonical JSON form of a prepared job payload"""
+	
+	canonical = json.dumps(job_data, sort_keys=True, separators=(",", ":"), default=str)
+	return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def set_published_payload(indeed_job, job_data, source_modified):
+	"""Record on `indeed_job` the payload Indeed now has and the Job Opening version it came from"""
+	
+	indeed_job.payload_hash = get_payload_hash(job_data)
+	indeed_job.published_payload = frappe.as_json(job_data)
+	indeed_job.source_modified = source_modified
+
+
+def update_integration_from_response(indeed_job, response, settings, job_data=None, source_modified=None):
+	"""Record the outcome of a posting attempt on its Indeed Job Integration"""
+	
+	if response.get("success"):
+		indeed_job.status = "Posted"
+		indeed_job.posted_date = indeed_job.posted_date or now_datetime()
+		indeed_job.indeed_job_id = response.get("job_id") or indeed_job.indeed_job_id
+		indeed_job.job_url = response.get("job_url") or indeed_job.job_url
+		if settings.integration_method == "XML_FEED":
+			indeed_job.xml_feed_included = 1
+		if job_data:
+			set_published_payload(indeed_job, job_data, source_modified)
+	else:
+		# A failed update leaves the live job as it was; only failed creates are errors
+		if not get_published_job_id(indeed_job):
+			indeed_job.status = "Error"
+		indeed_job.error_message = response.get("error", "Unknown error")
+	
+	indeed_job.last_sync_date = now_datetime()
+	indeed_job.save()
+
+
+class RateLimiter:
+	"""Thread-safe limiter spacing calls at most `rate` per second"""
+	
+	def __init__(self, rate):
+		self.interval = 1.0 / rate if rate and rate > 0 else 0
+		self.next_slot = 0.0
+		self.lock = threading.Lock()
+	
+	def wait(self):
+		if not self.interval:
+			return
+		
+		with self.lock:
+			now = time.monotonic()
+			slot = max(now, self.next_slot)
+			self.next_slot = slot + self.interval
+		
+		if slot > now:
+			time.sleep(slot - now)
+
+
+def post_batch_via_indeed_api(job_data_list, settings, job_ids=None):
+	"""Post several jobs to the Indeed API concurrently
+	
+	Requests run on a bounded thread pool (`bulk_post_workers`) and are spaced by
+	`api_rate_limit` requests per second. The worker threads only perform HTTP
+	calls; all database writes stay on the calling thread. Jobs with an entry
+	in `job_ids` are updated in place rather than created again. Results are
+	returned in the same order as `job_data_list`.
+	"""
+	
+	if not job_data_list:
+		return []
+	
+	job_ids = job_ids or [None] * len(job_data_list)
+	
+	def post_one(job_data, job_id):
+		if job_id:
+			return update_via_indeed_api(job_id, job_data, settings)
+		return post_via_indeed_api(job_data, settings, None)
+	
+	return run_indeed_api_calls(post_one, list(zip(job_data_list, job_ids)), settings)
+
+
+def run_indeed_api_calls(call, arguments, settings):
+	"""Run `call(*args)` for each entry of `arguments` on the rate limited thread pool"""
+	
+	if not arguments:
+		return []
+	
+	workers = cint(settings.get("bulk_post_workers")) or 4
+	workers = max(1, min(workers, len(arguments)))
+	limiter = RateLimiter(flt(settings.get("api_rate_limit")) or 5)
+	
+	def run_one(args):
+		limiter.wait()
+		try:
+			return call(*args)
+		except Exception as e:
+			return {"success": False, "error": str(e)}
+	
+	if workers == 1:
+		return [run_one(args) for args in arguments]
+	
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		return list(executor.map(run_one, arguments))
 
 
 def prepare_job_data(job_opening, settings):
@@ -131,7 +312,7 @@ def prepare_job_data(job_opening, settings):
 		"salary_min": job_opening.get("lower_range"),
 		"salary_max": job_opening.get("upper_range"),
 		"currency": job_opening.get("currency", "USD"),
-		"application_url": f"{get_url()}/jobs/{job_opening.name}",
+		"application_url": get_application_url(job_opening),
 		"external_id": job_opening.name,
 		"posting_date": job_opening.creation.strftime('%Y-%m-%d'),
 		"department": job_opening.get("department", ""),
@@ -139,17 +320,18 @@ def prepare_job_data(job_opening, settings):
 	}
 
 
-def post_via_indeed_api(job_data, settings, indeed_job):
-	"""Post job using Indeed's Job Sync API (requires partner status)"""
+def get_application_url(job_opening):
+	"""Application URL published for a job; AB test variants go through view tracking"""
 	
-	if not settings.access_token:
-		return {"success": False, "error": "Access token not configured"}
+	if job_opening.get("custom_ab_test_campaign"):
+		from indeed.indeed.ab_tracking import get_tracking_url
+		return get_tracking_url(job_opening.name)
 	
-	# OAuth authentication for Indeed API
-	auth_headers = {
-		"Authorization": f"Bearer {settings.access_token}",
-		"Content-Type": "application/json"
-	}
+	return f"{get_url()}/jobs/{job_opening.name}"
+
+
+def post_via_indeed_api(job_data, settings, indeed_job):
+	"""Post job using Indeed's Job Sync API (requires partner status)"""
 	
 	# GraphQL mutation for job creation
 	mutation = """
@@ -169,26 +351,92 @@ def post_via_indeed_api(job_data, settings, indeed_job):
 	}
 	"""
 	
-	variables = {
-		"input": {
-			"title": job_data["title"],
-			"description": job_data["description"],
-			"location": job_data["location"],
-			"employmentType": map_employment_type(job_data["employment_type"]),
-			"applicationUrl": job_data["application_url"],
-			"externalId": job_data["external_id"],
-			"companyName": job_data["company"]
+	return run_indeed_job_mutation(mutation, "createJob", {"input": get_indeed_job_input(job_data)}, settings)
+
+
+def update_via_indeed_api(job_id, job_data, settings):
+	"""Replace the content of a job already posted through the Indeed API"""
+	
+	mutation = """
+	mutation UpdateJob($sourcedPostingId: ID!, $input: JobInput!) {
+		updateJob(sourcedPostingId: $sourcedPostingId, input: $input) {
+			job {
+				id
+				sourcedPostingId
+				status
+				jobUrl
+			}
+			errors {
+				message
+				field
+			}
 		}
 	}
+	"""
+	
+	variables = {"sourcedPostingId": job_id, "input": get_indeed_job_input(job_data)}
+	return run_indeed_job_mutation(mutation, "updateJob", variables, settings)
+
+
+def expire_via_indeed_api(job_id, settings):
+	"""Take a job posted through the Indeed API off Indeed"""
+	
+	mutation = """
+	mutation ExpireJob($sourcedPostingId: ID!) {
+		expireJob(sourcedPostingId: $sourcedPostingId) {
+			job {
+				id
+				sourcedPostingId
+				status
+				jobUrl
+			}
+			errors {
+				message
+				field
+			}
+		}
+	}
+	"""
+	
+	return run_indeed_job_mutation(mutation, "expireJob", {"sourcedPostingId": job_id}, settings)
+
+
+def get_indeed_job_input(job_data):
+	"""Build the Indeed API JobInput for a prepared job payload"""
+	
+	job_input = {
+		"title": job_data["title"],
+		"description": job_data["description"],
+		"location": job_data["location"],
+		"employmentType": map_employment_type(job_data["employment_type"]),
+		"applicationUrl": job_data["application_url"],
+		"externalId": job_data["external_id"],
+		"companyName": job_data["company"]
+	}
 	
 	# Add salary if available
 	if job_data.get("salary_min") and job_data.get("salary_max"):
-		variables["input"]["salary"] = {
+		job_input["salary"] = {
 			"min": job_data["salary_min"],
 			"max": job_data["salary_max"],
 			"currency": job_data["currency"]
 		}
 	
+	return job_input
+
+
+def run_indeed_job_mutation(mutation, operation, variables, settings):
+	"""Send a job mutation to the Indeed GraphQL API and normalise its result"""
+	
+	if not settings.access_token:
+		return {"success": False, "error": "Access token not configured"}
+	
+	# OAuth authentication for Indeed API
+	auth_headers = {
+		"Authorization": f"Bearer {settings.access_token}",
+		"Content-Type": "application/json"
+	}
+	
 	try:
 		response = requests.post(
 			"https://api.indeed.com/graphql",
@@ -199,10 +447,10 @@ def post_via_indeed_api(job_data, settings, indeed_job):
 		
 		if response.status_code == 200:
 			result = response.json()
-			job_result = result.get("data", {}).get("createJob", {})
+			job_result = (result.get("data") or {}).get(operation) or {}
 			
 			if not job_result.get("errors"):
-				job_info = job_result.get("job", {})
+				job_info = job_result.get("job") or {}
 				return {
 					"success": True,
 					"job_id": job_info.get("sourcedPostingId"),
@@ -214,7 +462,7 @@ def post_via_indeed_api(job_data, settings, indeed_job):
 				return {"success": False, "error": error_msg}
 		else:
 			return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
-		
+	
 	except Exception as e:
 		return {"success": False, "error": str(e)}
 
@@ -222,6 +470,33 @@ def post_via_indeed_api(job_data, settings, indeed_job):
 def add_to_xml_feed(job_data, indeed_job):
 	"""Add job to XML feed for Indeed crawler"""
 	
+	return add_jobs_to_xml_feed([job_data])[0]
+
+
+def remove_jobs_from_xml_feed(reference_numbers):
+	"""Remove jobs from the XML feed file with a single read and write; returns the number removed"""
+	
+	xml_file_path = os.path.join(frappe.utils.get_site_path(), "public", "files", "indeed_jobs.xml")
+	if not reference_numbers or not os.path.exists(xml_file_path):
+		return 0
+	
+	with xml_feed_lock():
+		root = ET.parse(xml_file_path).getroot()
+		removed = remove_feed_jobs(root, set(reference_numbers))
+		
+		if removed:
+			write_xml_feed(root, xml_file_path)
+	
+	return removed
+
+
+def add_jobs_to_xml_feed(job_data_list):
+	"""Add several jobs to the XML feed with a single read and write of the file
+	
+	Jobs already in the feed are replaced, so republishing a changed job
+	updates its entry instead of duplicating it.
+	"""
+	
 	try:
 		# Get the XML feed file path
 		site_path = frappe.utils.get_site_path()
@@ -230,82 +505,130 @@ def add_to_xml_feed(job_data, indeed_job):
 		# Create directory if it doesn't exist
 		os.makedirs(os.path.dirname(xml_file_path), exist_ok=True)
 		
-		# Load existing XML or create new
-		if os.path.exists(xml_file_path):
-			tree = ET.parse(xml_file_path)
-			root = tree.getroot()
-		else:
-			root = ET.Element("source")
+		with xml_feed_lock():
+			# Load existing XML or create new
+			if os.path.exists(xml_file_path):
+				tree = ET.parse(xml_file_path)
+				root = tree.getroot()
+			else:
+				root = ET.Element("source")
+				
+				# Add publisher info
+				publisher = ET.SubElement(root, "publisher")
+				publisher.text = job_data_list[0]["company"]
+				
+				publisherurl = ET.SubElement(root, "publisherurl")
+				publisherurl.text = job_data_list[0]["company_url"]
+				
+				tree = ET.ElementTree(root)
 			
-			# Add publisher info
-			publisher = ET.SubElement(root, "publisher")
-			publisher.text = job_data["company"]
+			# Update lastBuildDate
+			lastbuild = root.find("lastBuildDate")
+			if lastbuild is None:
+				lastbuild = ET.SubElement(root, "lastBuildDate")
+			lastbuild.text = now_datetime().strftime('%a, %d %b %Y %H:%M:%S GMT')
 			
-			publisherurl = ET.SubElement(root, "publisherurl")
-			publisherurl.text = job_data["company_url"]
+			remove_feed_jobs(root, {job_data["external_id"] for job_data in job_data_list})
 			
-			tree = ET.ElementTree(root)
-		
-		# Update lastBuildDate
-		lastbuild = root.find("lastBuildDate")
-		if lastbuild is None:
-			lastbuild = ET.SubElement(root, "lastBuildDate")
-		lastbuild.text = now_datetime().strftime('%a, %d %b %Y %H:%M:%S GMT')
-		
-		# Create job element
-		job = ET.SubElement(root, "job")
-		
-		# Add job fields
-		job_fields = {
-			"title": job_data["title"],
-			"date": now_datetime().strftime('%a, %d %b %Y %H:%M:%S GMT'),
-			"referencenumber": job_data["external_id"],
-			"url": job_data["application_url"],
-			"company": job_data["company"],
-			"city": job_data["location"],
-			"description": job_data["description"],
-			"jobtype": job_data["employment_type"]
-		}
-		
-		# Add salary if available
-		if job_data.get("salary_min") and job_data.get("salary_max"):
-			job_fields["salary"] = f"{job_data['salary_min']}-{job_data['salary_max']}"
-		
-		# Add category if available
-		if job_data.get("job_category"):
-			job_fields["category"] = job_data["job_category"]
-		
-		# Add experience if available
-		if job_data.get("experience_level"):
-			job_fields["experience"] = job_data["experience_level"]
-		
-		for field, value in job_fields.items():
-			elem = ET.SubElement(job, field)
-			if field in ["title", "company", "city", "description"]:
-				elem.text = f"<![CDATA[{cstr(value)}]]>"
-			else:
-				elem.text = cstr(value)
-		
-		# Format and save XML
-		rough_string = ET.tostring(root, 'utf-8')
-		reparsed = minidom.parseString(rough_string)
-		pretty_xml = reparsed.toprettyxml(indent="  ")
-		
-		# Remove extra blank lines
-		pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
-		
-		with open(xml_file_path, 'w', encoding='utf-8') as f:
-			f.write(pretty_xml)
-		
-		return {
-			"success": True,
-			"job_id": job_data["external_id"],
-			"job_url": f"{get_url()}/files/indeed_jobs.xml",
-			"method": "XML_FEED"
-		}
-		
+			for job_data in job_data_list:
+				append_feed_job(root, job_data, now_datetime())
+			
+			write_xml_feed(root, xml_file_path)
+		
+		return [
+			{
+				"success": True,
+				"job_id": job_data["external_id"],
+				"job_url": f"{get_url()}/files/indeed_jobs.xml",
+				"method": "XML_FEED"
+			}
+			for job_data in job_data_list
+		]
+	
 	except Exception as e:
-		return {"success": False, "error": str(e)}
+		return [{"success": False, "error": str(e)} for _job_data in job_data_list]
+
+
+def append_feed_job(root, job_data, date):
+	"""Append a <job> element for a prepared job payload to the feed root"""
+	
+	job = ET.SubElement(root, "job")
+	
+	# Add job fields
+	job_fields = {
+		"title": job_data["title"],
+		"date": date.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+		"referencenumber": job_data["external_id"],
+		"url": job_data["application_url"],
+		"company": job_data["company"],
+		"city": job_data["location"],
+		"description": job_data["description"],
+		"jobtype": job_data["employment_type"]
+	}
+	
+	# Add salary if available
+	if job_data.get("salary_min") and job_data.get("salary_max"):
+		job_fields["salary"] = f"{job_data['salary_min']}-{job_data['salary_max']}"
+	
+	# Add category if available
+	if job_data.get("job_category"):
+		job_fields["category"] = job_data["job_category"]
+	
+	# Add experience if available
+	if job_data.get("experience_level"):
+		job_fields["experience"] = job_data["experience_level"]
+	
+	for field, value in job_fields.items():
+		elem = ET.SubElement(job, field)
+		if field in ["title", "company", "city", "description"]:
+			elem.text = f"<![CDATA[{cstr(value)}]]>"
+		else:
+			elem.text = cstr(value)
+
+
+def remove_feed_jobs(root, reference_numbers):
+	"""Remove the <job> elements whose reference number is in `reference_numbers`"""
+	
+	removed = 0
+	for job in root.findall("job"):
+		if cstr(job.findtext("referencenumber")).strip() in reference_numbers:
+			root.remove(job)
+			removed += 1
+	
+	return removed
+
+
+@contextmanager
+def xml_feed_lock():
+	"""Serialise read-modify-write cycles of the XML feed file across workers"""
+	
+	lock = frappe.cache().lock(
+		frappe.cache().make_key("indeed:xml_feed:lock"),
+		timeout=FEED_LOCK_TTL,
+		blocking_timeout=FEED_LOCK_TIMEOUT
+	)
+	if not lock.acquire():
+		frappe.throw(_("The Indeed XML feed is being updated by another process, please try again"))
+	
+	try:
+		yield
+	finally:
+		release_lock(lock)
+
+
+def write_xml_feed(root, xml_file_path):
+	"""Pretty print the feed and write it to disk"""
+	
+	# Format and save XML
+	rough_string = ET.tostring(root, 'utf-8')
+	reparsed = minidom.parseString(rough_string)
+	pretty_xml = reparsed.toprettyxml(indent="  ")
+	
+	# Remove extra blank lines
+	pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
+	
+	with open(xml_file_path, 'w', encoding='utf-8') as f:
+		f.write(pretty_xml)
 
 
 def post_via_third_party(job_data, settings, indeed_job):
@@ -352,7 +675,7 @@ def indeed_application_webhook():
 		else:
 			frappe.local.response.http_status_code = 400
 			return {"status": "error", "message": result.get("error", "Processing failed")}
-		
+	
 	except Exception as e:
 		frappe.log_error(f"Indeed webhook error: {str(e)}", "Indeed Integration")
 		frappe.local.response.http_status_code = 500
@@ -459,7 +782,7 @@ def create_job_applicant_from_indeed(application_data):
 		send_new_applicant_notification(applicant)
 		
 		return {"success": True, "applicant_id": applicant.name}
-		
+	
 	except Exception as e:
 		frappe.log_error(f"Job applicant creation failed: {str(e)}", "Indeed Integration")
 		return {"success": False, "error": str(e)}
@@ -496,7 +819,7 @@ def download_indeed_resume(resume_url, candidate_name):
 		file_doc.insert(ignore_permissions=True)
 		
 		return file_doc.file_url
-		
+	
 	except Exception as e:
 		frappe.log_error(f"Resume download failed: {str(e)}", "Indeed Integration")
 		return None
@@ -570,91 +893,83 @@ def send_new_applicant_notification(applicant):
 			reference_doctype="Job Applicant",
 			reference_name=applicant.name
 		)
-		
+	
 	except Exception as e:
 		frappe.log_error(f"Notification failed: {str(e)}", "Indeed Integration")
 
 
 @frappe.whitelist()
 def regenerate_xml_feed():
-	"""Regenerate complete XML feed from all active Indeed job integrations"""
+	"""Regenerate complete XML feed from all active Indeed job integrations
+	
+	Jobs whose Job Opening has not changed since their payload was last
+	published are written from the stored payload instead of being prepared
+	again from the full document.
+	"""
 	
 	try:
-		# Get all active job integrations
-		job_integrations = frappe.get_all(
-			"Indeed Job Integration",
-			filters={"status": ["in", ["Posted", "Active"]]},
-			fields=["job_opening", "name"]
-		)
-		
-		if not job_integrations:
-			return {"success": True, "message": "No active jobs to include in feed"}
-		
-		# Get XML file path
-		site_path = frappe.utils.get_site_path()
-		xml_file_path = os.path.join(site_path, "public", "files", "indeed_jobs.xml")
-		
-		# Create root element
-		root = ET.Element("source")
-		
-		# Get settings for company info
-		settings = get_integration_settings()
-		
-		# Add publisher info
-		company_name = settings.company or "Company"
-		publisher = ET.SubElement(root, "publisher")
-		publisher.text = company_name
-		
-		publisherurl = ET.SubElement(root, "publisherurl")
-		publisherurl.text = settings.company_url or get_url()
-		
-		lastbuild = ET.SubElement(root, "lastBuildDate")
-		lastbuild.text = now_datetime().strftime('%a, %d %b %Y %H:%M:%S GMT')
-		
-		# Add jobs
-		for integration in job_integrations:
-			job_opening = frappe.get_doc("Job Opening", integration.job_opening)
-			job_data = prepare_job_data(job_opening, settings)
+		# Other workers add and remove feed jobs; hold them off until the rebuilt feed is written
+		with xml_feed_lock():
+			# Get all active job integrations
+			job_integrations = frappe.db.sql("""
+				SELECT i.name, i.job_opening, i.integration_method, i.xml_feed_included,
+					i.published_payload, i.source_modified, jo.modified, jo.creation
+				FROM `tabIndeed Job Integration` i
+				INNER JOIN `tabJob Opening` jo ON jo.name = i.job_opening
+				WHERE i.status IN %(statuses)s
+			""", {"statuses": PUBLISHED_STATUSES}, as_dict=True)
 			
-			# Create job element
-			job = ET.SubElement(root, "job")
+			if not job_integrations:
+				return {"success": True, "message": "No active jobs to include in feed"}
 			
-			# Add job fields
-			job_fields = {
-				"title": job_data["title"],
-				"date": job_opening.creation.strftime('%a, %d %b %Y %H:%M:%S GMT'),
-				"referencenumber": job_data["external_id"],
-				"url": job_data["application_url"],
-				"company": job_data["company"],
-				"city": job_data["location"],
-				"description": job_data["description"],
-				"jobtype": job_data["employment_type"]
-			}
+			# Get XML file path
+			site_path = frappe.utils.get_site_path()
+			xml_file_path = os.path.join(site_path, "public", "files", "indeed_jobs.xml")
 			
-			# Add salary if available
-			if job_data.get("salary_min") and job_data.get("salary_max"):
-				job_fields["salary"] = f"{job_data['salary_min']}-{job_data['salary_max']}"
+			# Create root element
+			root = ET.Element("source")
+			
+			# Get settings for company info
+			settings = get_integration_settings()
+			
+			# Add publisher info
+			company_name = settings.company or "Company"
+			publisher = ET.SubElement(root, "publisher")
+			publisher.text = company_name
+			
+			publisherurl = ET.SubElement(root, "publisherurl")
+			publisherurl.text = settings.company_url or get_url()
 			
-			for field, value in job_fields.items():
-				elem = ET.SubElement(job, field)
-				if field in ["title", "company", "city", "description"]:
-					elem.text = f"<![CDATA[{cstr(value)}]]>"
+			lastbuild = ET.SubElement(root, "lastBuildDate")
+			lastbuild.text = now_datetime().strftime('%a, %d %b %Y %H:%M:%S GMT')
+			
+			# Add jobs
+			for integration in job_integrations:
+				if integration.published_payload and integration.source_modified == integration.modified:
+					job_data = json.loads(integration.published_payload)
 				else:
-					elem.text = cstr(value)
+					job_data = prepare_job_data(frappe.get_doc("Job Opening", integration.job_opening), settings)
+					
+					# The feed is what XML feed jobs publish, so this is now their published payload
+					if integration.integration_method == "XML_FEED":
+						frappe.db.set_value("Indeed Job Integration", integration.name, {
+							"payload_hash": get_payload_hash(job_data),
+							"published_payload": frappe.as_json(job_data),
+							"source_modified": integration.modified
+						}, update_modified=False)
+				
+				append_feed_job(root, job_data, integration.creation)
 			
-			# Update integration record
-			frappe.db.set_value("Indeed Job Integration", integration.name, "xml_feed_included", 1)
-		
-		# Format and save XML
-		rough_string = ET.tostring(root, 'utf-8')
-		reparsed = minidom.parseString(rough_string)
-		pretty_xml = reparsed.toprettyxml(indent="  ")
+			write_xml_feed(root, xml_file_path)
 		
-		# Remove extra blank lines
-		pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
-		
-		with open(xml_file_path, 'w', encoding='utf-8') as f:
-			f.write(pretty_xml)
+		# Update integration records
+		not_included = [integration.name for integration in job_integrations if not integration.xml_feed_included]
+		if not_included:
+			frappe.db.sql("""
+				UPDATE `tabIndeed Job Integration`
+				SET xml_feed_included = 1
+				WHERE name IN %(names)s
+			""", {"names": not_included})
 		
 		frappe.db.commit()
 		
@@ -663,7 +978,7 @@ def regenerate_xml_feed():
 			"message": f"XML feed regenerated with {len(job_integrations)} jobs",
 			"feed_url": f"{get_url()}/files/indeed_jobs.xml"
 		}
-		
+	
 	except Exception as e:
 		frappe.log_error(f"XML feed regeneration failed: {str(e)}", "Indeed Integration")
 		return {"success": False, "error": str(e)}
@@ -697,6 +1012,6 @@ def setup_default_indeed_settings():
 		frappe.db.commit()
 		
 		frappe.msgprint("Default Indeed integration settings have been configured.", alert=True)
-		
+	
 	except Exception as e:
 		frappe.log_error(f"Error setting up default Indeed settings: {str(e)}", "Indeed Setup")
\ No newline at end of file
@@ -0,0 +1,7 @@
+import frappe
+
+
+def execute():
+	"""Index Job Applicant on (modified, name) for incremental change exports"""
+	
+	frappe.db.add_index("Job Applicant", ["modified", "name"], index_name="indeed_modified_name_index")
@@ -0,0 +1,7 @@
+import frappe
+
+
+def execute():
+	"""Index Job Opening on (creation, name) for keyset pagination in Bulk Job Manager"""
+	
+	frappe.db.add_index("Job Opening", ["creation", "name"], index_name="indeed_creation_name_index")
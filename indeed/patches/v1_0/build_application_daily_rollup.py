@@ -0,0 +1,10 @@
+import frappe
+from indeed.indeed.analytics_rollup import WATERMARK_KEY, rebuild_rollup
+
+
+def execute():
+	"""Backfill Application Daily Rollup from existing Job Applicants"""
+	
+	started_at = frappe.utils.now_datetime()
+	rebuild_rollup()
+	frappe.db.set_global(WATERMARK_KEY, str(started_at))